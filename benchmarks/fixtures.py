@@ -0,0 +1,332 @@
+
+import json
+import random
+import sqlite3
+import threading
+
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import makedirs
+from os.path import join
+
+# BOM sheet header (B2:AB2), as read by hssformats.bom
+BOM_HEADER = [
+    'MARK', 'QTY', 'COMM', 'Description', None, None, 'Length', None,
+    'SPEC', 'GRADE', 'TEST', 'SHIP WT (LBS)', 'REMARKS',
+]
+
+# work order header (row 2), with the aliased OperationN columns
+WORKORDER_HEADER = [
+    'TransType', 'District', 'ItemName', 'Qty', 'Material', 'DueDate',
+    'Customer', 'DwgNumber', 'Remark', 'ItemData1', 'ItemData2', 'ItemData3',
+    'ItemData4', 'Process', 'SAP Network Number', 'Operation2', 'Operation3',
+    'Operation4', 'Operation5', 'Operation6', 'Operation7', 'Operation8',
+    'Operation9', 'Operation10',
+]
+
+GRADES = [('A709', '50'), ('A709', '50W'), ('A709', 'HPS70W'), ('A572', '50'), ('A36', '36')]
+COMMS = ['PL', 'PL', 'PL', 'FB', 'SHEAR STUD']
+
+
+def bom_rows(rnd, sheet, assemblies, parts):
+    """
+        BOM data rows: each assembly row (no COMM)
+        is followed by its parts
+    """
+
+    rows = list()
+    for a in range(assemblies):
+        rows.append(['G{}{:0>3}'.format(sheet, a), rnd.randint(1, 8)])
+
+        for p in range(parts):
+            if p % 3:
+                # component part (assembly-component)
+                mark = 'W{}'.format(p)
+            else:
+                mark = 'a{}{:0>3}p{}'.format(sheet, a, p)
+
+            spec, grade = rnd.choice(GRADES)
+            rows.append([
+                mark, rnd.randint(1, 4), rnd.choice(COMMS),
+                rnd.choice([0.5, 0.625, 0.75, 1.0, 1.5]), None,
+                rnd.randint(6, 48), rnd.randint(1, 40), rnd.randint(0, 11),
+                spec, grade, rnd.choice([None, 'T', 'F2']),
+                rnd.randint(10, 4000), None,
+            ])
+
+    return rows
+
+
+def make_bom_workbook(path, sheets=4, assemblies=50, parts=6, seed=0):
+    """
+        Writes a BOM shaped .xlsx: header at B2, data from row 4
+        and a print area around the data of each sheet
+    """
+
+    import openpyxl
+
+    rnd = random.Random(seed)
+
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for s in range(sheets):
+        ws = wb.create_sheet('S{}'.format(s + 1))
+        for c, value in enumerate(BOM_HEADER, start=2):
+            ws.cell(2, c, value)
+
+        r = 4
+        for row in bom_rows(rnd, s, assemblies, parts):
+            for c, value in enumerate(row, start=2):
+                if value is not None:
+                    ws.cell(r, c, value)
+            r += 1
+
+        ws.print_area = 'A1:AB{}'.format(r - 1)
+
+    wb.save(path)
+
+    return path
+
+
+def make_bom_folder(directory, workbooks=3, **kwargs):
+    makedirs(directory, exist_ok=True)
+
+    paths = list()
+    for i in range(workbooks):
+        path = join(directory, 'BOM{}.xlsx'.format(i + 1))
+        paths.append(make_bom_workbook(path, seed=i, **kwargs))
+
+    return paths
+
+
+def workorder_rows(rnd, rows, job='1200123A'):
+    data = list()
+    for i in range(rows):
+        data.append([
+            'SN81', 'HS', '{}-{:0>4}'.format(job, i), rnd.randint(1, 10),
+            '-'.join(rnd.choice(GRADES)), None, 'PA', 'D{}'.format(i % 40),
+            rnd.choice([None, 'RUSH']), job, '1', None, None, 'PL',
+            'N{}'.format(rnd.randint(1000, 9999)), rnd.choice([None, 'BEND']),
+            None, None, 'M{}'.format(i), '50/50W-0{}'.format(rnd.randint(100, 999)),
+            None, None, None, None,
+        ])
+
+    return data
+
+
+def make_workorder_workbook(path, rows=500, seed=0, job='1200123A'):
+    """
+        Writes a work order shaped workbook: title in row 1,
+        header in row 2 of sheet WorkOrders_Template
+    """
+
+    import openpyxl
+
+    rnd = random.Random(seed)
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'WorkOrders_Template'
+    ws.append(['Work Orders'])
+    ws.append(WORKORDER_HEADER)
+    for row in workorder_rows(rnd, rows, job):
+        ws.append(row)
+
+    wb.save(path)
+
+    return path
+
+
+SNDB_SCHEMA = """
+    CREATE TABLE Stock (
+        SheetName TEXT, HeatNumber TEXT, BinNumber TEXT, PrimeCode TEXT,
+        Thickness REAL, Width REAL, Length REAL, Area REAL
+    );
+    CREATE TABLE StockHistory (
+        SheetName TEXT, ProgramName TEXT, HeatNumber TEXT, BinNumber TEXT,
+        PrimeCode TEXT, Thickness REAL, Width REAL, Length REAL
+    );
+    CREATE TABLE StockArchive (
+        ArcDateTime SNDATETIME, SheetName TEXT, ProgramName TEXT,
+        HeatNumber TEXT, BinNumber TEXT, PrimeCode TEXT
+    );
+    CREATE TABLE Program (ProgramName TEXT, SheetName TEXT);
+    CREATE TABLE ProgArchive (
+        AutoID INTEGER PRIMARY KEY, ArcDateTime SNDATETIME, SheetName TEXT,
+        ProgramName TEXT, TransType TEXT, MachineName TEXT
+    );
+    CREATE TABLE PIP (PartName TEXT, ProgramName TEXT);
+    CREATE TABLE PIPArchive (
+        ArcDateTime SNDATETIME, PartName TEXT, ProgramName TEXT, TransType TEXT
+    );
+    CREATE TABLE Part (PartName TEXT, QtyOrdered INTEGER);
+
+    CREATE INDEX ix_stock_sheet ON Stock (SheetName);
+    CREATE INDEX ix_stockhistory_sheet ON StockHistory (SheetName);
+    CREATE INDEX ix_progarchive_sheet ON ProgArchive (SheetName);
+    CREATE INDEX ix_piparchive_part ON PIPArchive (PartName);
+"""
+
+
+def sndb_datetime(value):
+    # SQL Server returns 0 as a datetime as 1900-01-01
+    if value == b'0':
+        return datetime(1900, 1, 1)
+
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_converter('SNDATETIME', sndb_datetime)
+
+
+def make_sndb(path=':memory:', programs=2000, parts_per_program=8, seed=0):
+    """
+        SQLite stand-in for SNDB, with the tables that
+        prodctrlcore.sndb queries
+
+        active (not yet burned) programs are in Stock/Program/PIP,
+        burned programs are in the archive tables (SN102)
+    """
+
+    rnd = random.Random(seed)
+
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+    conn.executescript(SNDB_SCHEMA)
+
+    start = datetime(2020, 1, 1)
+    for i in range(programs):
+        program = '{:0>5}'.format(10000 + i)
+        sheet = 'S{}'.format(20000 + i)
+        heat, po = 'H{}'.format(rnd.randint(1000, 9999)), str(rnd.randint(10000, 99999))
+        mm = '50/50W-0{}'.format(rnd.randint(100, 999))
+        thk, wid, length = rnd.choice([0.5, 0.75, 1.0]), 96.0, rnd.choice([240.0, 480.0])
+        parts = ['1200{:0>3}A-{}'.format(rnd.randint(0, 200), rnd.randint(1, 999))
+                 for _ in range(parts_per_program)]
+
+        if i % 5 == 0:
+            # active
+            conn.execute("INSERT INTO Stock VALUES (?,?,?,?,?,?,?,?)",
+                         (sheet, heat, po, mm, thk, wid, length, wid * length))
+            conn.execute("INSERT INTO Program VALUES (?,?)", (program, sheet))
+            conn.executemany("INSERT INTO PIP VALUES (?,?)", [(p, program) for p in parts])
+            continue
+
+        burned = (start + timedelta(hours=i)).isoformat(' ')
+        conn.execute("INSERT INTO StockHistory VALUES (?,?,?,?,?,?,?,?)",
+                     (sheet, program, heat, po, mm, thk, wid, length))
+        conn.execute("INSERT INTO StockArchive VALUES (?,?,?,?,?,?)",
+                     (burned, sheet, program, heat, po, mm))
+        conn.execute("INSERT INTO ProgArchive (ArcDateTime, SheetName, ProgramName, TransType, MachineName) "
+                     "VALUES (?,?,?,?,?)", (burned, sheet, program, 'SN102', 'Gemini'))
+        conn.executemany("INSERT INTO PIPArchive VALUES (?,?,?,?)",
+                         [(burned, p, program, 'SN102') for p in parts])
+
+    conn.commit()
+
+    return conn
+
+
+class FakeMondayHandler(BaseHTTPRequestHandler):
+
+    """
+        Answers the queries in prodctrlcore/monday/graphql
+        for a board of server.jobs
+    """
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        query = request['query']
+        variables = request.get('variables') or dict()
+
+        data = self.server.respond(query, variables)
+        body = json.dumps(dict(data=data)).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeMondayServer(ThreadingHTTPServer):
+
+    """
+        FakeMondayServer: local stand-in for the monday GraphQL api
+
+        with FakeMondayServer(jobs=500) as server:
+            board = JobBoard(endpoint=server.url, token='token')
+    """
+
+    daemon_threads = True
+
+    COLUMNS = [
+        ('name', 'Name', 'name'),
+        ('pm', 'PM', 'text'),
+        ('type', 'Type', 'text'),
+        ('location', 'Location', 'text'),
+        ('early_start', 'Early Start', 'date'),
+        ('main_start', 'Main Start', 'date'),
+    ]
+
+    def __init__(self, jobs=200, board_name='Jobs'):
+        super().__init__(('127.0.0.1', 0), FakeMondayHandler)
+
+        self.board_name = board_name
+        self.jobs = ['D-{:0>7}A-{:0>2}'.format(1200000 + i, 1) for i in range(jobs)]
+        self.values = dict()        # (item id, column id) -> text
+        self.complexity = 10000000
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://{}:{}/v2'.format(*self.server_address)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def respond(self, query, variables):
+        self.complexity -= 100
+        complexity = dict(query=100, after=self.complexity)
+
+        if 'change_column_value' in query:
+            key = (variables['job_id'], variables['column_id'])
+            value = json.loads(variables['column_val'])
+            if isinstance(value, dict):
+                value = value.get('date')
+            self.values[key] = value
+
+            return dict(change_column_value=dict(id=str(variables['job_id'])))
+
+        if 'column_values' in query:
+            item_id = variables.get('job_id')
+            values = [dict(id=column_id, text=self.values.get((item_id, column_id)), value=None)
+                      for column_id in variables.get('column_ids') or []]
+            items = [dict(name=self.jobs[item_id - 1], column_values=values)]
+
+            return dict(complexity=complexity, boards=[dict(items=items)])
+
+        if 'items' in query:
+            items = [dict(id=str(i), name=job) for i, job in enumerate(self.jobs, start=1)]
+
+            return dict(complexity=complexity, boards=[dict(groups=[dict(items=items)])])
+
+        if 'columns' in query:
+            columns = [dict(id=_id, title=title, type=_type) for _id, title, _type in self.COLUMNS]
+            groups = [dict(id='topics', title='Active Jobs')]
+
+            return dict(complexity=complexity, boards=[dict(columns=columns, groups=groups)])
+
+        if 'boards' in query:
+            return dict(complexity=complexity, boards=[
+                dict(id='1', name=self.board_name), dict(id='2', name='Other')])
+
+        return dict(complexity=complexity)
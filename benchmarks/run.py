@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+
+"""
+    Benchmarks of prodctrlcore's hot paths, on synthetic fixtures
+    (see fixtures.py). Excel, SNDB and monday are not needed.
+
+    python benchmarks/run.py                        # run all, print results
+    python benchmarks/run.py -o before.json         # save results
+    python benchmarks/run.py -k bom -k sndb         # run matching benchmarks
+    python benchmarks/run.py --compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import random
+import platform
+import tempfile
+
+from argparse import ArgumentParser
+from datetime import datetime
+from os.path import abspath, dirname, join
+from statistics import median
+from time import perf_counter
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, join(ROOT, 'src'))
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import fixtures     # noqa: E402
+
+BENCHMARKS = dict()
+
+
+def benchmark(name):
+    """
+        Registers a benchmark
+
+        the decorated function is given the run's options and
+        returns a callable to time (setup is not timed)
+    """
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+@benchmark('header.inference')
+def header_inference(opts, tmp):
+    from prodctrlcore.io import HeaderParser
+
+    keys = ['matl', 'op2', 'op3', 'op4', 'qty', 'remark', 'dwg', 'heat', 'ItemName', 'mark']
+
+    def run():
+        for _ in range(opts.scale * 10):
+            header = HeaderParser(header=list(fixtures.WORKORDER_HEADER))
+            header.add_header_aliases(Mark='Operation5', HeatMarkKeyWord='Operation10')
+            for key in keys:
+                header.get_index(key)
+
+    return run
+
+
+@benchmark('sheet.add_row')
+def sheet_add_row(opts, tmp):
+    from prodctrlcore.io import FileSheet, FileSheetReader
+
+    rnd = random.Random(0)
+    rows = fixtures.workorder_rows(rnd, opts.scale * 50)
+
+    def run():
+        sheet = FileSheet('WorkOrders_Template', [['Work Orders'], list(fixtures.WORKORDER_HEADER)])
+        reader = FileSheetReader(sheet, header_range='A2')
+        for row in rows:
+            reader.add_row(row)
+
+    return run
+
+
+@benchmark('sheet.add_rows')
+def sheet_add_rows(opts, tmp):
+    from prodctrlcore.io import FileSheet, FileSheetReader
+
+    rnd = random.Random(0)
+    rows = fixtures.workorder_rows(rnd, opts.scale * 50)
+
+    def run():
+        sheet = FileSheet('WorkOrders_Template', [['Work Orders'], list(fixtures.WORKORDER_HEADER)])
+        FileSheetReader(sheet, header_range='A2').add_rows(rows)
+
+    return run
+
+
+@benchmark('workorder.read')
+def workorder_read(opts, tmp):
+    from prodctrlcore.hssformats.workorder import read_workorder
+
+    path = fixtures.make_workorder_workbook(join(tmp, 'wo.xlsx'), rows=opts.scale * 50)
+
+    return lambda: read_workorder(path)
+
+
+def bom_collector(tmp):
+    from prodctrlcore.hssformats import BomDataCollector
+
+    return BomDataCollector('1200123A', 1, use_cache=False, job_folder=join(tmp, 'BOM'))
+
+
+def bom_folder(opts, tmp):
+    fixtures.make_bom_folder(join(tmp, 'BOM'), workbooks=3, assemblies=opts.scale * 2, parts=6)
+
+
+@benchmark('bom.process')
+def bom_process(opts, tmp):
+    # sheet processing only (workbooks read before timing)
+    from prodctrlcore.hssformats.bom import read_workbook
+
+    bom_folder(opts, tmp)
+    collector = bom_collector(tmp)
+    books = [(path, read_workbook(path)) for path in collector.get_bom_files()]
+
+    def run():
+        _collector = bom_collector(tmp)
+        for path, sheets in books:
+            _collector.merge_sheets(path, sheets)
+
+    return run
+
+
+@benchmark('bom.load')
+def bom_load(opts, tmp):
+    # read (without Excel) and process every workbook
+    bom_folder(opts, tmp)
+
+    return lambda: bom_collector(tmp).load_bom(workers=2)
+
+
+@benchmark('bom.part_totals')
+def bom_part_totals(opts, tmp):
+    from prodctrlcore.hssformats.bom import rollup_quantities
+
+    bom_folder(opts, tmp)
+    collector = bom_collector(tmp)
+    collector.load_bom(workers=2)
+
+    return lambda: rollup_quantities(collector.parts)
+
+
+def sndb_cursor(opts):
+    return fixtures.make_sndb(programs=opts.scale * 20).cursor()
+
+
+@benchmark('sndb.sheet')
+def sndb_sheet(opts, tmp):
+    from prodctrlcore.sndb import query
+
+    cursor = sndb_cursor(opts)
+
+    return lambda: [query.sheet('S2{:0>4}%'.format(i), cursor=cursor) for i in range(50)]
+
+
+@benchmark('sndb.part')
+def sndb_part(opts, tmp):
+    from prodctrlcore.sndb import query
+
+    cursor = sndb_cursor(opts)
+
+    return lambda: [query.part('1200{:0>3}A-1'.format(i), cursor=cursor) for i in range(50)]
+
+
+@benchmark('sndb.material_master')
+def sndb_material_master(opts, tmp):
+    from prodctrlcore.sndb import query
+
+    cursor = sndb_cursor(opts)
+
+    return lambda: [query.material_master('50/50W-0{}%'.format(i), cursor=cursor) for i in range(100, 150)]
+
+
+@benchmark('monday.update_job_data')
+def monday_update_job_data(opts, tmp):
+    from prodctrlcore.monday import JobBoard
+
+    server = fixtures.FakeMondayServer(jobs=opts.scale * 2).__enter__()
+    opts.cleanup.append(lambda: server.__exit__())
+
+    board = JobBoard(endpoint=server.url, token='token')
+    jobs = server.jobs[:20]
+
+    def run():
+        for i, job in enumerate(jobs):
+            board.update_job_data(job, pm='PM{}'.format(i % 3), early_start=datetime(2020, 1, 1 + i % 28))
+
+    return run
+
+
+def run_benchmarks(opts):
+    results = dict()
+
+    for name, setup in BENCHMARKS.items():
+        if opts.k and not any(k in name for k in opts.k):
+            continue
+
+        opts.cleanup = list()
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                func = setup(opts, tmp)
+
+                times = list()
+                for _ in range(opts.repeat):
+                    start = perf_counter()
+                    func()
+                    times.append(perf_counter() - start)
+            except Exception as e:
+                print("{:<28} ERROR {}: {}".format(name, type(e).__name__, e))
+                continue
+            finally:
+                for cleanup in opts.cleanup:
+                    cleanup()
+
+        results[name] = dict(min=min(times), median=median(times), max=max(times), repeat=len(times))
+        print("{:<28} min {:>9.2f} ms   median {:>9.2f} ms".format(
+            name, results[name]['min'] * 1000, results[name]['median'] * 1000))
+
+    return dict(
+        created=datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        scale=opts.scale,
+        results=results,
+    )
+
+
+def compare(before_file, after_file):
+    with open(before_file) as stream:
+        before = json.load(stream)
+    with open(after_file) as stream:
+        after = json.load(stream)
+
+    if before.get('scale') != after.get('scale'):
+        print("warning: runs have different scales ({} and {})".format(
+            before.get('scale'), after.get('scale')))
+
+    print("{:<28} {:>12} {:>12} {:>8}".format('benchmark', 'before ms', 'after ms', 'change'))
+    for name in sorted(set(before['results']) | set(after['results'])):
+        old = before['results'].get(name, dict()).get('median')
+        new = after['results'].get(name, dict()).get('median')
+
+        if old is None or new is None:
+            print("{:<28} {:>12} {:>12}".format(
+                name, '-' if old is None else round(old * 1000, 2), '-' if new is None else round(new * 1000, 2)))
+            continue
+
+        print("{:<28} {:>12.2f} {:>12.2f} {:>+7.1f}%".format(
+            name, old * 1000, new * 1000, (new - old) / old * 100))
+
+
+def main():
+    parser = ArgumentParser(description="prodctrlcore benchmarks")
+    parser.add_argument('-k', action='append', help="run benchmarks whose name contains K")
+    parser.add_argument('-n', '--repeat', type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument('-s', '--scale', type=int, default=20, help="fixture size multiplier")
+    parser.add_argument('-o', '--output', help="save results to file (json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="compare saved results")
+    opts = parser.parse_args()
+
+    if opts.compare:
+        compare(*opts.compare)
+        return
+
+    # keep benchmark runs out of the user's cache
+    os.environ.setdefault('PRODCTRLCORE_CACHE', tempfile.mkdtemp())
+
+    results = run_benchmarks(opts)
+    if opts.output:
+        with open(opts.output, 'w') as stream:
+            json.dump(results, stream, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 
-from .bom import BomDataCollector
-from .flgdata import FlangeData
-from .tagschedule import TagSchedule
+from .bom import BomDataCollector, collect_boms
+from .flgdata import FlangeData, load_flg_data
+from .tagschedule import TagSchedule, FileTagSchedule, export_tag_schedules
 from .workorder import WorkOrder, WorkOrderJobData
 
 from ._alias import *
@@ -1,14 +1,20 @@
 #!/usr/bin/env python
 
-import xlwings
 import os
 import re
+import sys
+import numpy
 import logging
+import traceback
 
-from glob import glob
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pandas import DataFrame
 from types import SimpleNamespace
 
-from prodctrlcore.io import HeaderParser
+from prodctrlcore import instrument
+from prodctrlcore.io import HeaderParser, FileBook, app_pool
+from prodctrlcore.utils import FileCache, dir_index
 
 ENG_DIR = r"\\hssieng\DATA\HS\JOBS"
 part_mark_pattern = re.compile(r'[a-zA-Z][0-9]+[a-zA-Z]+')
@@ -49,23 +55,49 @@ eng_data_maps.GRADE = {  # (spec, grade, test)
 
 force_cvn_mode = False
 
+# sheets read from each workbook (see read_book)
+bom_cache = FileCache('bom')
+# marks on each sheet of each workbook (see index_marks)
+mark_cache = FileCache('bom_marks')
+
 
 class BomDataCollector:
 
-    def __init__(self, job, shipment, requires_full_load=False, force_cvn=False):
+    def __init__(self, job, shipment, requires_full_load=False, force_cvn=False, workers=None, use_cache=True, job_folder=None):
         self.job = job
         self.shipment = shipment
 
+        # number of processes to read workbooks with (see load_bom)
+        self.workers = workers
+
+        # reuse sheets read from unchanged workbooks (see bom_cache)
+        self.use_cache = use_cache
+
         self.parts = dict()
         self.bom = dict()
-        self.null_part = Part(grade=None, thickness=0)
+        self.null_part = Part(grade=None, thk=0)
 
-        self.get_job_folder()
+        # mark -> [(workbook, sheet name)] (see index_marks)
+        self.mark_index = None
+        # (workbook, sheet name) of sheets processed
+        self.loaded_sheets = set()
+        # workbook -> sheets read while indexing marks (see index_marks)
+        self._read_books = dict()
+
+        # incremented when parts or assemblies change (see part_totals)
+        self.bom_version = 0
+        self._totals = None
+
+        if job_folder:
+            self.job_folder = job_folder
+        else:
+            self.get_job_folder()
 
         self.fetched_job_standards = False
         self.fetched_full_bom = False
 
         if force_cvn:
+            global force_cvn_mode
             force_cvn_mode = True
 
         if requires_full_load:
@@ -76,8 +108,11 @@ class BomDataCollector:
             if part_mark_pattern.match(part_name):
                 if not self.fetched_job_standards:
                     self.load_job_standards()
-            else:
-                if not self.fetched_full_bom:
+            elif not self.fetched_full_bom:
+                self.load_part(part_name)
+
+                # part could not be located by mark
+                if part_name not in self.parts.keys():
                     self.load_bom()
 
         try:
@@ -85,77 +120,238 @@ class BomDataCollector:
         except KeyError:
             return self.null_part
 
-    def load_bom(self):
+    def load_bom(self, workers=None):
+        """
+            Loads every BOM workbook for the job
+
+            workers: number of processes to read workbooks in parallel
+                     (default: self.workers)
+                     if more than 1, workbooks are read from disk without
+                     Excel and merged in the order of get_bom_files()
+
+            workbooks that are unchanged since they were last read
+            are loaded from bom_cache (unless use_cache is False)
+        """
+
         # TODO: Cross reference JobStandards with rest of data?
 
-        # fetch full bom
-        xl_app = xlwings.App()
-        for bom_file in self.get_bom_files():
-            wb = xl_app.books.open(bom_file)
+        bom_files = list(self.get_bom_files())
+
+        workers = workers or self.workers
+        if workers and workers > 1:
+            self._load_bom_parallel(bom_files, workers)
+        else:
+            self._load_bom_serial(bom_files)
+
+        self.fetched_full_bom = True
+
+    def _load_bom_serial(self, bom_files, skip_bom_processing=False):
+        for bom_file in bom_files:
+            sheets = self.get_cached(bom_file)
+
+            if sheets is None:
+                with app_pool.book(bom_file) as wb:
+                    sheets = read_book(wb)
 
-            for sheet in wb.sheets:
-                if sheet.name not in skip.sheets:
+                self.set_cached(bom_file, sheets)
+
+            self.merge_sheets(bom_file, sheets, skip_bom_processing)
+
+    def _load_bom_parallel(self, bom_files, workers):
+        cached = dict()
+        for bom_file in bom_files:
+            cached[bom_file] = self.get_cached(bom_file)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = dict()
+            for bom_file, sheets in cached.items():
+                if sheets is None:
+                    futures[bom_file] = pool.submit(read_workbook, bom_file)
+
+            # merge in listed order so that results are deterministic
+            for bom_file in bom_files:
+                sheets = cached[bom_file]
+
+                if sheets is None:
                     try:
-                        self.extract_sheet_data(sheet)
+                        sheets = futures[bom_file].result()
                     except:
-                        logging.exception(
-                            "Error at workbook {} sheet {}".format(wb.name, sheet.name))
+                        logging.exception("Error at workbook {}".format(
+                            os.path.basename(bom_file)))
+                        continue
 
-            wb.close()
-        xl_app.quit()
+                    self.set_cached(bom_file, sheets)
 
-        self.fetched_full_bom = True
+                self.merge_sheets(bom_file, sheets)
 
-    def load_job_standards(self):
-        # fetch job standards data
-        xl_app = xlwings.App()
-        xl_file = glob(os.path.join(self.job_folder, "JobStandards.xls*"))[0]
-        wb = xl_app.books.open(xl_file)
+    def merge_sheets(self, bom_file, sheets, skip_bom_processing=False):
+        """
+            Processes the sheets returned by read_book
+        """
+
+        book_name = os.path.basename(bom_file)
+
+        for sheet_name, header, rows, error in sheets:
+            if error:
+                logging.error("Error at workbook {} sheet {}\n{}".format(
+                    book_name, sheet_name, error))
+                continue
+
+            # already loaded by load_part
+            if (bom_file, sheet_name) in self.loaded_sheets:
+                continue
+
+            try:
+                self.process_sheet(header, rows, skip_bom_processing)
+            except:
+                logging.exception(
+                    "Error at workbook {} sheet {}".format(book_name, sheet_name))
+
+            if not skip_bom_processing:
+                self.loaded_sheets.add((bom_file, sheet_name))
+
+    def index_marks(self):
+        """
+            Builds mark_index: the workbooks and sheets
+            each mark appears on
+
+            workbooks without cached marks are read in full
+            while open, so that load_sheet and load_bom
+            do not open them again
+        """
 
-        for sheet in wb.sheets:
-            if sheet.name not in skip.sheets:
+        self.mark_index = defaultdict(list)
+
+        for bom_file in self.get_bom_files():
+            marks = self.get_cached_marks(bom_file)
+
+            if marks is None:
+                with app_pool.book(bom_file) as wb:
+                    sheets = read_book(wb)
+
+                self._read_books[bom_file] = sheets
+                self.set_cached(bom_file, sheets)
+
+                marks = list()
+                for sheet_name, header, rows, error in sheets:
+                    if error:
+                        logging.error("Error at workbook {} sheet {}\n{}".format(
+                            os.path.basename(bom_file), sheet_name, error))
+                        continue
+
+                    marks.append((sheet_name, marks_from_rows(header, rows)))
+
+                # sheets that failed to read are retried next time
+                if self.use_cache and len(marks) == len(sheets):
+                    mark_cache.set(bom_file, marks)
+
+            for sheet_name, sheet_marks in marks:
+                for mark in sheet_marks:
+                    if mark:
+                        self.mark_index[mark].append((bom_file, sheet_name))
+
+    def load_part(self, part_name):
+        """
+            Loads only the sheets that part_name appears on
+
+            parts listed as assembly-component are located
+            by their assembly's mark
+        """
+
+        if self.mark_index is None:
+            self.index_marks()
+
+        locations = self.mark_index.get(part_name)
+        if not locations:
+            # assembly-component (assembly marks may contain '-')
+            pieces = part_name.split('-')
+            for i in range(len(pieces) - 1, 0, -1):
+                locations = self.mark_index.get('-'.join(pieces[:i]))
+                if locations:
+                    break
+
+        for bom_file, sheet_name in locations or []:
+            self.load_sheet(bom_file, sheet_name)
+
+    def load_sheet(self, bom_file, sheet_name):
+        if (bom_file, sheet_name) in self.loaded_sheets:
+            return
+
+        sheets = self.get_cached(bom_file)
+        if sheets is not None:
+            sheets = [s for s in sheets if s[0] == sheet_name]
+        else:
+            with app_pool.book(bom_file) as wb:
                 try:
-                    self.extract_sheet_data(sheet, skip_bom_processing=True)
-                except:
-                    logging.exception(
-                        "Error at workbook {} sheet {}".format(wb.name, sheet.name))
+                    header, rows = read_sheet(wb.sheets[sheet_name])
+                    sheets = [(sheet_name, header, rows, None)]
+                except Exception:
+                    sheets = [(sheet_name, None, None, traceback.format_exc())]
+
+        self.merge_sheets(bom_file, sheets)
+
+    def get_cached(self, bom_file):
+        # read by index_marks, whether or not use_cache is set
+        sheets = self._read_books.get(bom_file)
+
+        if sheets is None and self.use_cache:
+            sheets = bom_cache.get(bom_file)
+
+        return sheets
+
+    def get_cached_marks(self, bom_file):
+        if not self.use_cache:
+            return None
 
-            wb.close()
-        xl_app.quit()
+        marks = mark_cache.get(bom_file)
+        if marks is None:
+            # marks from a full read of the workbook
+            sheets = bom_cache.get(bom_file)
+            if sheets is not None:
+                marks = [(name, marks_from_rows(header, rows))
+                         for name, header, rows, error in sheets if not error]
+
+        return marks
+
+    def set_cached(self, bom_file, sheets):
+        # sheets that failed to read are retried next time
+        if self.use_cache and not any(error for *_, error in sheets):
+            bom_cache.set(bom_file, sheets)
+
+    def load_job_standards(self):
+        # fetch job standards data
+        xl_file = dir_index.glob(os.path.join(self.job_folder, "JobStandards.xls*"))[0]
+        self._load_bom_serial([xl_file], skip_bom_processing=True)
 
         self.fetched_job_standards = True
 
     def get_job_folder(self):
         # find path
         base_folder = os.path.join(ENG_DIR, self.job)
-        for folder in glob(base_folder + '-*'):
-            folder_shipment = folder.split('-')[1]
-            if folder_shipment.isalpha():
-                continue
-            if str(int(self.shipment)) in folder_shipment:
-                self.job_folder = os.path.join(folder, 'BOM')
-                break
-        else:
-            self.job_folder = os.path.join(base_folder, 'BOM')
+        self.job_folder = find_job_folder(
+            self.job, self.shipment, dir_index.glob(base_folder + '-*'))
+
         logging.info(
             "Using engineering BOM folder: {}".format(self.job_folder))
 
     def get_bom_files(self):
         # workbook list generator
-        for entry in os.scandir(self.job_folder):
-            if entry.is_file() and entry.name.split('.')[0] not in skip.books:
-                yield entry.path
+        for bom_file in dir_index.files(self.job_folder):
+            if os.path.basename(bom_file).split('.')[0] not in skip.books:
+                yield bom_file
 
     def extract_sheet_data(self, sheet, skip_bom_processing=False):
-        end = sheet.range('Print_Area').last_cell.row
+        header, rows = read_sheet(sheet)
 
+        self.process_sheet(header, rows, skip_bom_processing)
+
+    def process_sheet(self, header_row, rows, skip_bom_processing=False):
         # assemblies queue
         assemblies = list()
 
         previous_line_type = 'ASSEMBLY'
-        header_rng = sheet.range("B2:AB2").value
-        header = self.process_header(HeaderParser(header=header_rng))
-        for row in sheet.range("B4:AB{}".format(end)).value:
+        header = self.process_header(HeaderParser(header=header_row))
+        for row in rows:
             line = self.process_line(header.parse_row(row))
 
             if skip_bom_processing:
@@ -184,6 +380,32 @@ class BomDataCollector:
                     del self.parts[line.mark]
                 previous_line_type = 'PART'
 
+        # assemblies at the end of the sheet
+        for _assembly in assemblies:
+            self.bom[_assembly.mark] = _assembly
+
+        self.bom_version += 1
+
+    def part_totals(self):
+        """
+            Total quantity of every part as a DataFrame indexed by mark
+            (every key of self.parts)
+
+            computed in one pass over the BOM's assembly -> part
+            quantities and cached until the BOM changes
+        """
+
+        if self._totals is None or self._totals[0] != self.bom_version:
+            self._totals = (self.bom_version, rollup_quantities(self.parts))
+
+        return self._totals[1]
+
+    def get_part_qty(self, part_name):
+        try:
+            return self.part_totals().at[part_name, 'qty']
+        except KeyError:
+            return 0
+
     def process_header(self, header):
         ALIASES = dict(
             name='MARK',
@@ -194,22 +416,25 @@ class BomDataCollector:
         )
 
         header.add_header_aliases(ALIASES)
-        header.indexes['Width'] = header.thk + 2
-        header.indexes['Length Inches'] = header.length + 1
+        header.add_column_index('Width', header.thk + 2)
+        header.add_column_index('Length Inches', header.length + 1)
 
-        if "LBS" in header.weight:
+        weight_header = header.names[header.weight]
+        if "LBS" in weight_header:
             header.units = "IMPERIAL"
-        elif "KG" in header.weight:
+        elif "KG" in weight_header:
             header.units = "METRIC"
 
+        return header
+
     def process_line(self, line):
 
         if line.mark is None or line.type in skip.types:
             return None
 
-        if type is None:    # ASSEMBLY
+        if line.type is None:    # ASSEMBLY
 
-            return Assembly(line)
+            return Assembly.from_row(line)
 
         # ~~~~~~~~~~~~~~~~~~ PART (not previously parsed/created) ~~~~~~~~~~~~~~~~~~~~~~~
         if line.mark not in self.parts.keys():
@@ -227,53 +452,314 @@ class BomDataCollector:
                 line.grade = _grade
                 line.test = _test
 
-            # data.remarks = line[header.REMARKS]
-            self.parts[line.mark] = Part(
-                parsed_row=line, len=length, length=length)
+            self.parts[line.mark] = Part.from_row(line, length=length)
 
         return self.parts[line.mark]
 
 
+def collect_boms(jobs, workers=None, use_cache=True, **kwargs):
+    """
+        Loads the BOMs of many jobs
+
+        jobs: (job, shipment) pairs
+        workers: number of processes shared by every job
+                 to read workbooks from disk (without Excel)
+
+        job folders are resolved with a single scan of ENG_DIR
+
+        yields ((job, shipment), BomDataCollector) as each job's
+        workbooks finish reading, so a slow job does not hold up
+        the jobs after it. Jobs whose workbooks are all cached
+        are yielded first.
+
+        kwargs are passed to BomDataCollector
+    """
+
+    folders = list_job_folders()
+
+    collectors = dict()
+    for job, shipment in jobs:
+        job_folder = find_job_folder(job, shipment, folders.get(job, []))
+        collectors[(job, shipment)] = BomDataCollector(
+            job, shipment, use_cache=use_cache, job_folder=job_folder, **kwargs)
+
+    bom_files = dict()      # (job, shipment) -> [workbook]
+    results = dict()        # workbook -> sheets (None if not read)
+    pending = dict()        # (job, shipment) -> workbooks not yet read
+    for key, collector in collectors.items():
+        try:
+            bom_files[key] = list(collector.get_bom_files())
+        except OSError:
+            logging.exception("Unable to list BOM folder {}".format(
+                collector.job_folder))
+            bom_files[key] = list()
+
+        pending[key] = set()
+        for bom_file in bom_files[key]:
+            results[bom_file] = collector.get_cached(bom_file)
+            if results[bom_file] is None:
+                pending[key].add(bom_file)
+
+    def merge(key):
+        collector = collectors[key]
+        for bom_file in bom_files[key]:
+            if results[bom_file] is not None:
+                collector.merge_sheets(bom_file, results[bom_file])
+
+        collector.fetched_full_bom = True
+
+        return key, collector
+
+    for key in collectors:
+        if not pending[key]:
+            yield merge(key)
+
+    waiting = {key: files for key, files in pending.items() if files}
+    if not waiting:
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = dict()
+        for key, files in waiting.items():
+            for bom_file in files:
+                futures[pool.submit(read_workbook, bom_file)] = key, bom_file
+
+        for future in as_completed(futures):
+            key, bom_file = futures[future]
+
+            try:
+                results[bom_file] = future.result()
+                collectors[key].set_cached(bom_file, results[bom_file])
+            except:
+                logging.exception("Error at workbook {}".format(
+                    os.path.basename(bom_file)))
+
+            waiting[key].discard(bom_file)
+            if not waiting[key]:
+                yield merge(key)
+    finally:
+        # if iteration stopped early, queued workbooks are not read
+        pool.shutdown(cancel_futures=True)
+
+
+def list_job_folders():
+    """
+        Scans ENG_DIR once, returning
+        job -> [shipment folders (i.e. 1200123A-1)]
+    """
+
+    folders = defaultdict(list)
+    for name, is_dir in dir_index.listdir(ENG_DIR):
+        if '-' in name and is_dir:
+            job = name.split('-')[0]
+            folders[job].append(os.path.join(ENG_DIR, name))
+
+    return folders
+
+
+def find_job_folder(job, shipment, folders):
+    """
+        Returns the BOM folder for the shipment
+        from the job's shipment folders
+    """
+
+    for folder in folders:
+        folder_shipment = os.path.basename(folder).split('-')[1]
+        if folder_shipment.isalpha():
+            continue
+        if str(int(shipment)) in folder_shipment:
+            return os.path.join(folder, 'BOM')
+
+    return os.path.join(ENG_DIR, job, 'BOM')
+
+
+def rollup_quantities(parts):
+    """
+        Totals the quantities of parts (a dict of mark -> Part)
+
+        Each part's total is the sum of assembly qty * part qty
+        over the assemblies it is on (see Part.qty). Parts listed
+        under several marks are totalled once.
+
+        returns a DataFrame of qty, indexed by mark
+    """
+
+    unique = dict()         # id(part) -> index in totals
+    part_index = list()
+    assembly_qty = list()
+    part_qty = list()
+
+    for part in parts.values():
+        if id(part) in unique:
+            continue
+
+        index = unique[id(part)] = len(unique)
+        for assembly, qty in part.assemblies:
+            part_index.append(index)
+            assembly_qty.append(assembly.qty or 0)
+            part_qty.append(qty or 0)
+
+    weights = numpy.multiply(
+        numpy.array(assembly_qty, dtype=float),
+        numpy.array(part_qty, dtype=float))
+    totals = numpy.bincount(
+        numpy.array(part_index, dtype=numpy.intp),
+        weights=weights, minlength=len(unique))
+
+    marks = list(parts.keys())
+    rows = [unique[id(part)] for part in parts.values()]
+
+    frame = DataFrame(dict(qty=totals[rows]), index=marks)
+    frame.index.name = 'mark'
+
+    return frame
+
+
+def read_sheet(sheet):
+    """
+        Reads the header and data rows of a BOM sheet
+
+        returns (header, rows) as lists of values
+    """
+
+    with instrument.timer('bom.read_sheet') as timer:
+        end = sheet.range('Print_Area').last_cell.row
+
+        header = sheet.range("B2:AB2").value
+        rows = sheet.range("B4:AB{}".format(end)).options(ndim=2).value
+        timer.add(rows=len(rows))
+
+    return header, rows
+
+
+def marks_from_rows(header, rows):
+    index = HeaderParser(header=header).get_index('MARK')
+
+    return [row[index] for row in rows]
+
+
+def read_workbook(bom_file):
+    """
+        Reads every BOM sheet of a workbook from disk (no Excel)
+
+        used as a process pool worker, so results are plain lists
+    """
+
+    return read_book(FileBook(bom_file))
+
+
+def read_book(wb):
+    """
+        Reads every BOM sheet of an open workbook
+
+        returns a list of (sheet name, header, rows, error)
+        where error is the formatted traceback if the sheet
+        could not be read
+    """
+
+    sheets = list()
+    for sheet in wb.sheets:
+        if sheet.name in skip.sheets:
+            continue
+
+        try:
+            header, rows = read_sheet(sheet)
+            sheets.append((sheet.name, header, rows, None))
+        except Exception:
+            sheets.append((sheet.name, None, None, traceback.format_exc()))
+
+    return sheets
+
+
 class Part:
 
-    def __init__(self, *args, **kwargs):
-        self.assemblies = list()    # assemblies that part occurs on
+    """
+        Part: A BOM part line
+
+        Only the fields in Part.fields are kept from the sheet row.
+        Grade and zone are normalized once, on creation.
+    """
+
+    fields = ('mark', 'type', 'thk', 'width', 'length', 'weight', 'spec', 'grade', 'test', 'remarks')
+
+    __slots__ = fields + ('zone', 'assemblies', '_grade', '_cvn_grade')
 
-        self.__dict__.update(kwargs)
+    def __init__(self, **kwargs):
+        for field in self.fields:
+            setattr(self, field, intern_str(kwargs.get(field)))
+
+        self.assemblies = list()    # assemblies that part occurs on
 
         if type(self.thk) is str:
             self.thk = eng_data_maps.THICKNESS[self.thk]
 
-    def __repr__(self):
-        return "[{qty}]|{part} ({grade})".format(qty=self.qty, part=self.name, grade=self.material_grade)
+        self._init_grade()
 
-    def __getattr__(self, attr):
-        if attr in self.__dict__:
-            return self.__dict__[attr]
+    @classmethod
+    def from_row(cls, row, **kwargs):
+        """
+            Copies Part.fields from a parsed row
 
-        return getattr(self.parsed_row, attr)
+            kwargs override values from the row
+        """
+
+        data = dict()
+        for field in cls.fields:
+            try:
+                data[field] = row.get_item(field)
+            except KeyError:
+                data[field] = None
+
+        data.update(kwargs)
+
+        return cls(**data)
+
+    def _init_grade(self):
+        if type(self.grade) in (float, int):     # float -> int  i.e. 50 -> '50'
+            self.grade = sys.intern(str(int(self.grade)))
 
-    @property
-    def material_grade(self):
         if self.grade is None:
-            return None
+            self.zone = None
+            self._grade = self._cvn_grade = None
+            return
 
         if 'HPS' in self.grade:
             self.zone = 3
         else:
             self.zone = 2
 
-        if type(self.grade) in (float, int):     # float -> int  i.e. 50 -> '50'
-            self.grade = int(self.grade)
-
-        grade = "{spec}-{grade}".format(spec=self.spec, grade=self.grade)
+        grade = sys.intern("{spec}-{grade}".format(spec=self.spec, grade=self.grade))
         if self.test == 'N/A':
-            return grade
+            self._grade = self._cvn_grade = grade
         elif self.test:
-            return grade + "{test}{zone}".format(test=self.test[0], zone=self.zone)
-        elif force_cvn_mode:
-            return grade + "T2"
-        return grade
+            self._grade = self._cvn_grade = sys.intern(
+                grade + "{test}{zone}".format(test=self.test[0], zone=self.zone))
+        else:
+            self._grade = grade
+            self._cvn_grade = sys.intern(grade + "T2")
+
+    def __repr__(self):
+        return "[{qty}]|{part} ({grade})".format(qty=self.qty, part=self.name, grade=self.material_grade)
+
+    @property
+    def name(self):
+        return self.mark
+
+    @property
+    def thickness(self):
+        return self.thk
+
+    @property
+    def len(self):
+        return self.length
+
+    @property
+    def material_grade(self):
+        if force_cvn_mode:
+            return self._cvn_grade
+
+        return self._grade
 
     @property
     def qty(self):
@@ -291,17 +777,33 @@ class Part:
 
 class Assembly:
 
-    def __init__(self, *args, **kwargs):
+    """
+        Assembly: A BOM assembly line
+    """
+
+    __slots__ = ('mark', 'qty', 'parts')
+
+    def __init__(self, mark=None, qty=None):
+        self.mark = intern_str(mark)
+        self.qty = qty
+
         self.parts = list()
 
-        self.__dict__.update(kwargs)
+    @classmethod
+    def from_row(cls, row):
+        return cls(mark=row.mark, qty=row.qty)
+
+    @property
+    def name(self):
+        return self.mark
 
     def add_part(self, part, qty):
         part.add_assembly(self, qty)
         self.parts.append(part)
 
-    def __getattr__(self, attr):
-        if attr in self.__dict__:
-            return self.__dict__[attr]
 
-        return getattr(self.parsed_row, attr)
+def intern_str(value):
+    if type(value) is str:
+        return sys.intern(value)
+
+    return value
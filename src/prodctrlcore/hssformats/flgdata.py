@@ -1,25 +1,132 @@
 
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
 from pandas import read_excel
-from os.path import join, exists
-from subprocess import call
+from os.path import join, dirname, exists
+from subprocess import run, TimeoutExpired, CalledProcessError
+
+from prodctrlcore.utils import FileCache, dir_index
 
 ENG_JOBS = r"\\hssieng\DATA\HS\JOBS"
 FLG_DATA_EXEC = r"\\hssieng\Resources\HS\PROG\FlgXlsData.exe"
 
+# seconds to wait for FLG_DATA_EXEC, per job
+GENERATE_TIMEOUT = 300
+# jobs to run FLG_DATA_EXEC for at once (see generate_flg_data_files)
+GENERATE_WORKERS = 4
+
+# columns read from FlangeData.xlsx (None: every column)
+# and dtypes by column (columns not listed are inferred)
+COLUMNS = None
+DTYPES = dict()
+
+# FlangeData.xlsx read as DataFrames (see FlangeData.get_data)
+flg_cache = FileCache('flgdata')
+
 
 class FlangeData:
 
-    def __init__(self, job):
+    def __init__(self, job, usecols=COLUMNS, dtype=DTYPES, timeout=GENERATE_TIMEOUT, use_cache=True):
         self.job = job
+        self.use_cache = use_cache
+
+        self.flg_data_file = flg_data_file(self.job)
+
+        # checked live: generating overwrites the file
+        if not exists(self.flg_data_file):
+            self.generate_flg_data(timeout)
+
+        self.get_data(usecols, dtype)
+
+    def get_data(self, usecols=COLUMNS, dtype=DTYPES):
+        """
+            Reads the columns usecols of the flange data file
+            as dtype (see pandas.read_excel)
+
+            the DataFrame is stored in flg_cache and reused
+            until the file changes (unless use_cache is False)
+        """
+
+        selection = repr((usecols, dtype))
+
+        cached = flg_cache.get(self.flg_data_file) if self.use_cache else None
+        if cached is not None and cached[0] == selection:
+            self.data = cached[1]
+            return
+
+        self.data = read_excel(
+            self.flg_data_file, usecols=usecols, dtype=dtype or None)
+
+        if self.use_cache:
+            flg_cache.set(self.flg_data_file, (selection, self.data))
+
+    def generate_flg_data(self, timeout=GENERATE_TIMEOUT):
+        return run_generator(self.job, timeout)
+
+
+def flg_data_file(job):
+    return join(ENG_JOBS, job, 'CAM', 'FlangeData.xlsx')
+
+
+def run_generator(job, timeout=GENERATE_TIMEOUT):
+    """
+        Runs FLG_DATA_EXEC for job
+
+        returns if the generator completed within timeout
+    """
+
+    try:
+        run([FLG_DATA_EXEC, job], timeout=timeout, check=True)
+        return True
+    except TimeoutExpired:
+        logging.error("Flange data generation timed out for {}".format(job))
+    except (CalledProcessError, OSError):
+        logging.exception("Flange data generation failed for {}".format(job))
+    finally:
+        dir_index.invalidate(dirname(flg_data_file(job)))
+
+    return False
+
+
+def generate_flg_data_files(jobs, workers=GENERATE_WORKERS, timeout=GENERATE_TIMEOUT):
+    """
+        Runs FLG_DATA_EXEC for the jobs that do not have
+        a flange data file, workers jobs at a time
+
+        returns {job: completed} for the jobs generated
+    """
+
+    # checked live (not through dir_index): generating overwrites the file
+    missing = [job for job in jobs if not exists(flg_data_file(job))]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        completed = pool.map(lambda job: run_generator(job, timeout), missing)
+
+        return dict(zip(missing, completed))
+
+
+def load_flg_data(jobs, workers=GENERATE_WORKERS, timeout=GENERATE_TIMEOUT, **kwargs):
+    """
+        Loads FlangeData for many jobs, generating
+        missing files concurrently first
+
+        returns {job: FlangeData}, without jobs whose
+        file could not be generated or read
+
+        kwargs are passed to FlangeData
+    """
 
-        self.flg_data_file = join(ENG_JOBS, self.job, 'CAM', 'FlangeData.xlsx')
-        if not exists(flg_data_file):
-            self.generate_flg_data()
+    generate_flg_data_files(jobs, workers, timeout)
 
-        self.get_data()
+    data = dict()
+    for job in jobs:
+        if not dir_index.isfile(flg_data_file(job)):
+            continue
 
-    def get_data(self, ):
-        self.data = read_excel(self.flg_data_file)
+        try:
+            data[job] = FlangeData(job, timeout=timeout, **kwargs)
+        except Exception:
+            logging.exception("Unable to read flange data for {}".format(job))
 
-    def generate_flg_data(self):
-        call([FLG_DATA_EXEC, self.job])
+    return data
@@ -1,11 +1,14 @@
 
 import os
-import xlwings
+import pandas
 
-from collections import defaultdict
 from argparse import ArgumentParser
+from time import time
+from types import SimpleNamespace
 
-from prodctrlcore.utils import CountingIter
+from prodctrlcore.io import app_pool
+from prodctrlcore.utils import FileCache
+from prodctrlcore.utils.cache import fingerprint
 
 COST_CENTERS = {
     2005: "WB",
@@ -15,62 +18,179 @@ COST_CENTERS = {
     2031: "MBS",
 }
 
+# named range -> (sheet, columns)
+RANGES = {
+    'DATES_HEADER': ('Dates', ['job', 'early_start', 'main_start']),
+    'PM_HEADER': ('PM', ['job', 'pm']),
+    'PRODUCTS_HEADER': ('Products', ['job', 'product', 'date']),
+    'BAYS_HEADER': ('Bays', ['job', 'cc']),
+}
+
+FIELDS = ['early_start', 'main_start', 'pm', 'product', 'bay']
+
+# seconds a refreshed job table is reused for (see get_schedule_changes)
+MAX_AGE = 15 * 60
+
+# (time refreshed, job table) of each scheduling workbook
+schedule_cache = FileCache('schedule')
+
+
+def get_job_ship_dates(xl_file, data_connection_name="High Steel Scheduling", as_frame=False):
+    with app_pool.book(xl_file) as wb:
+        return read_job_ship_dates(wb, data_connection_name, as_frame)
+
+
+def get_schedule_changes(xl_file, data_connection_name="High Steel Scheduling", max_age=MAX_AGE, force=False):
+    """
+        Returns (jobs, diff) where
+            jobs: job table DataFrame (see job_table)
+            diff: changes since the previous call (see diff_jobs)
+
+        The previous job table is kept in schedule_cache.
+        The data connection is not refreshed (and the diff is empty)
+        if the previous table is less than max_age seconds old
+        and the workbook has not changed since, unless force is True.
+
+        The workbook is only saved if the job table changed.
+    """
+
+    stored = schedule_cache.get_entry(xl_file)
+
+    previous = None
+    if stored is not None:
+        stored_fingerprint, (refreshed, previous) = stored
+
+        is_current = stored_fingerprint == fingerprint(xl_file)
+        if is_current and time() - refreshed < max_age and not force:
+            return previous, diff_jobs(previous, previous)
 
-def get_job_ship_dates(xl_file, data_connection_name="High Steel Scheduling"):
-    jobs = defaultdict(dict)
-    wb = xlwings.Book(xl_file)
+    with app_pool.book(xl_file) as wb:
+        jobs = read_job_ship_dates(wb, data_connection_name, as_frame=True, save=False)
+
+        diff = diff_jobs(previous, jobs)
+        if previous is None or diff.added or diff.removed or diff.changed:
+            wb.save()
+
+    schedule_cache.set(xl_file, (time(), jobs))
+
+    return jobs, diff
+
+
+def read_job_ship_dates(wb, data_connection_name, as_frame=False, save=True):
+    """
+        Refreshes the scheduling data connection and
+        returns the job table (see job_table)
+
+        as_frame: return a DataFrame indexed by job
+                  instead of {job: {field: value}}
+    """
 
     print("Refreshing data connections")
     wb.api.Connections(data_connection_name).Refresh()
 
-    # Early Start and Main Start dates
-    data = wb.sheets['Dates'].range("DATES_HEADER").expand('down').value
-    iter = CountingIter(data, "Reading Dates")
-    next(iter)
-    for job, early_start, main_start in iter:
-        jobs[job]['early_start'] = early_start
-        jobs[job]['main_start'] = main_start
-
-    # Project Manager
-    data = wb.sheets['PM'].range("PM_HEADER").expand('down').value
-    iter = CountingIter(data, "Reading PM's")
-    next(iter)
-    for job, pm in iter:
-        jobs[job]['pm'] = pm
-
-    # Products/Types
-    data = wb.sheets['Products'].range("PRODUCTS_HEADER").expand('down').value
-    iter = CountingIter(data, "Reading Products")
-    next(iter)
-    prev_job, products = None, list()
-    for job, product, date in iter:
-        if job != prev_job:
-            jobs[prev_job]['product'] = ','.join(products)
-            prev_job, products = job, list()
-
-        if product == 'S' and jobs[prev_job]['main_start'] is None:
-            jobs[job]['main_start'] = date
-
-        products.append(product)
-
-    # Fab Bays
-    data = wb.sheets['Bays'].range("BAYS_HEADER").expand('down').value
-    iter = CountingIter(data, "Reading Bays")
-    next(iter)
-    prev_job, bays = None, list()
-    for job, cc in iter:
-        if job != prev_job:
-            jobs[prev_job]['bay'] = ','.join(bays)
-            prev_job, bays = job, list()
-
-        bays.append(COST_CENTERS[int(cc)])  # cost center might be string
-
-    del jobs[None]  # may have been created from products and bays
-
-    wb.save()
-    if len(wb.app.books) > 1:
-        wb.close()
-    else:
-        wb.app.quit()
-
-    return jobs
+    jobs = job_table(**read_ranges(wb))
+
+    if save:
+        wb.save()
+
+    if as_frame:
+        return jobs
+
+    return to_dict(jobs)
+
+
+def read_ranges(wb):
+    """
+        Reads each of RANGES in one call,
+        returning {sheet name: DataFrame}
+    """
+
+    frames = dict()
+    for name, (sheet, columns) in RANGES.items():
+        data = wb.sheets[sheet].range(name).expand('down').options(ndim=2).value
+
+        # first row is the header
+        frames[sheet.lower()] = pandas.DataFrame(data[1:], columns=columns)
+
+    return frames
+
+
+def job_table(dates, pm, products, bays):
+    """
+        Joins the schedule ranges into one row per job
+
+        early_start, main_start:    from dates
+            main_start falls back to the date of the
+            job's first 'S' product
+        pm:                         from pm
+        product:                    job's products, comma separated
+        bay:                        job's fab bays (COST_CENTERS), comma separated
+    """
+
+    jobs = dates.drop_duplicates('job', keep='last').set_index('job')
+    jobs = jobs.join(pm.drop_duplicates('job', keep='last').set_index('job'), how='outer')
+
+    products = products[products.job.notna()]
+    product = products.groupby('job', sort=False).product.agg(join_values)
+
+    structural = products[products['product'] == 'S']
+    first_structural = structural.groupby('job', sort=False).date.first()
+
+    bays = bays[bays.job.notna()]
+    cost_centers = pandas.to_numeric(bays.cc).astype(int)
+    bay_names = cost_centers.map(COST_CENTERS)
+    if bay_names.isna().any():
+        raise KeyError("Unknown cost centers: {}".format(
+            sorted(cost_centers[bay_names.isna()].unique())))
+    bay = bay_names.groupby(bays.job, sort=False).agg(join_values)
+
+    jobs = jobs.join(product.rename('product'), how='outer')
+    jobs = jobs.join(bay.rename('bay'), how='outer')
+    jobs = jobs.reindex(columns=FIELDS)
+
+    main_start = jobs.main_start.where(jobs.main_start.notna(), first_structural.reindex(jobs.index))
+    jobs['main_start'] = main_start
+
+    jobs = jobs[jobs.index.notna()]
+    jobs.index.name = 'job'
+
+    return jobs.astype(object).where(jobs.notna(), None)
+
+
+def diff_jobs(old, new):
+    """
+        Compares job tables (old may be None)
+
+        returns namespace of
+            added:      [job]
+            removed:    [job]
+            changed:    {job: {field: (old value, new value)}}
+    """
+
+    if old is None:
+        old = pandas.DataFrame(columns=FIELDS)
+
+    added = [job for job in new.index if job not in old.index]
+    removed = [job for job in old.index if job not in new.index]
+
+    common = new.index.intersection(old.index)
+    _old = old.loc[common, FIELDS]
+    _new = new.loc[common, FIELDS]
+
+    differs = ~((_old == _new) | (_old.isna() & _new.isna()))
+
+    changed = dict()
+    for job, field in zip(*differs.values.nonzero()):
+        job, field = common[job], FIELDS[field]
+        changed.setdefault(job, dict())[field] = (_old.at[job, field], _new.at[job, field])
+
+    return SimpleNamespace(added=added, removed=removed, changed=changed)
+
+
+def join_values(values):
+    return ','.join(map(str, values))
+
+
+def to_dict(jobs):
+    # {job: {field: value}}
+    return jobs.to_dict('index')
@@ -1,5 +1,10 @@
 
-from prodctrlcore.io import JobBookReader
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from pandas import concat, DataFrame
+
+from prodctrlcore.io import JobBookReader, FileJobBookReader
 
 TAGSCHED_DIR = r"\\hssfileserv1\HSSShared\HSSI Lean\CAD-CAM\TagSchedule"
 TEMPLATE = "TagSchedule_Template.xls"
@@ -12,8 +17,64 @@ CODE_SHEET_KWARGS = dict(
     header_range='A2:G2',
 )
 
+# sheet name -> reader kwargs
+SHEETS = {
+    'WEBS': WEBFLG_SHEET_KWARGS,
+    'FLANGES': WEBFLG_SHEET_KWARGS,
+    'CODE DELIVERY': CODE_SHEET_KWARGS,
+}
+
+
+class TagScheduleSheets:
+    """
+        Sheets of a tag schedule, bound on first access
+        (only the sheets used have their header read)
+
+        Paired with a workbook backend:
+            TagSchedule:        Excel, through xlwings
+            FileTagSchedule:    read from disk, no Excel
+    """
+
+    @property
+    def webs(self):
+        return self.tag_sheet('WEBS')
+
+    @property
+    def flanges(self):
+        return self.tag_sheet('FLANGES')
+
+    @property
+    def code(self):
+        return self.tag_sheet('CODE DELIVERY')
+
+    def tag_sheet(self, sheet_name):
+        if sheet_name not in self._tag_sheets:
+            self._tag_sheets[sheet_name] = self.sheet(sheet_name, **SHEETS[sheet_name])
+
+        return self._tag_sheets[sheet_name]
 
-class TagSchedule(JobBookReader):
+    def to_frame(self, columns=None, dtypes=dict()):
+        """
+            Web and flange rows as one DataFrame,
+            with job, shipment and part_type (WEB or FLANGE) columns
+
+            see SheetReader.to_frame for arguments
+        """
+
+        frames = list()
+        for part_type, sheet in (('WEB', self.webs), ('FLANGE', self.flanges)):
+            frame = sheet.to_frame(columns, dtypes)
+            frame.insert(0, 'part_type', part_type)
+            frames.append(frame)
+
+        frame = concat(frames, ignore_index=True)
+        frame.insert(0, 'shipment', self.shipment)
+        frame.insert(0, 'job', self.job)
+
+        return frame
+
+
+class TagSchedule(TagScheduleSheets, JobBookReader):
 
     def __init__(self, job, shipment=None, **kwargs):
         kwargs.update(
@@ -22,6 +83,50 @@ class TagSchedule(JobBookReader):
         )
 
         super().__init__(job, shipment, **kwargs)
-        self.webs = self.sheet('WEBS', **WEBFLG_SHEET_KWARGS)
-        self.flanges = self.sheet('FLANGES', **WEBFLG_SHEET_KWARGS)
-        self.code = self.sheet('CODE DELIVERY', **CODE_SHEET_KWARGS)
+
+        self._tag_sheets = dict()   # sheet name -> reader
+
+
+class FileTagSchedule(TagScheduleSheets, FileJobBookReader):
+
+    def __init__(self, job, shipment=None, **kwargs):
+        kwargs.update(
+            directory=TAGSCHED_DIR,
+            template=TEMPLATE
+        )
+
+        super().__init__(job, shipment, **kwargs)
+
+        self._tag_sheets = dict()   # sheet name -> reader
+
+
+def export_tag_schedules(jobs, columns=None, dtypes=dict(), workers=None):
+    """
+        Web and flange rows of many jobs as one DataFrame
+        (see TagScheduleSheets.to_frame)
+
+        jobs: job-shipments (i.e. '1200123A-1')
+              or (job, shipment) pairs
+
+        tag schedules are read from disk (no Excel), workers at
+        a time; jobs without a tag schedule are skipped
+    """
+
+    def read(job):
+        if type(job) is str:
+            job = (job, None)
+
+        try:
+            return FileTagSchedule(*job).to_frame(columns, dtypes)
+        except FileNotFoundError:
+            logging.warning("No tag schedule for {}".format('-'.join(map(str, job))))
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # in the order of jobs
+        frames = [frame for frame in pool.map(read, jobs) if frame is not None]
+
+    if not frames:
+        return DataFrame()
+
+    return concat(frames, ignore_index=True)
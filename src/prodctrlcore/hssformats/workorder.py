@@ -1,9 +1,16 @@
 
-from glob import glob
+import logging
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from os.path import join, basename
 from re import compile as regex
+from time import monotonic
 
-from prodctrlcore.io import JobBookReader, JobParser
+from prodctrlcore.io import JobBookReader, JobParser, HeaderParser, FileBook, FileSheetReader
+from prodctrlcore.utils import FileCache, dir_index
+from prodctrlcore.utils.cache import fingerprint
 from ._alias import workorder as HEADER_ALIASES
 
 WORKORDER_DIR = r"\\hssieng\DATA\HS\SAP - Material Master_BOM\SigmaNest Work Orders"
@@ -38,6 +45,12 @@ ADD_KEYS = [
 FOLDER_SUFFIX = " Work Orders Created"
 FILE_SUFFIX = "_SimTrans_WO"
 
+DATA_SHEET = 'WorkOrders_Template'
+HEADER_RANGE = 'A2'
+
+# rows of every work order file in a year folder (see WorkOrderIndex)
+index_cache = FileCache('workorder_index')
+
 
 class WorkOrder(JobBookReader):
 
@@ -50,45 +63,100 @@ class WorkOrder(JobBookReader):
         )
         super().__init__(job, shipment, **kwargs)
 
-        self.data_sheet = self.sheet('WorkOrders_Template', header_range='A2')
+        self.data_sheet = self.sheet(DATA_SHEET, header_range=HEADER_RANGE)
         self.data_sheet.add_header_aliases(HEADER_ALIASES)
 
+        # source header -> [(data_sheet index, source index)] of ADD_KEYS
+        self._mappings = dict()
+        self._width = max(self.data_sheet.header.indexes.values()) + 1
+
+        # rows buffered by batch()
+        self._batch = None
+
     def add(self, row):
-        row_data = dict()
-        for key in ADD_KEYS:
-            row_data[key] = row.get_item(key)
+        if self._batch is not None:
+            self._batch.append(self._row_values(row))
+        else:
+            self.data_sheet.add_row(self._row_values(row))
+
+    def add_rows(self, rows):
+        # writes all new rows as one block
+        if self._batch is not None:
+            self._batch.extend(map(self._row_values, rows))
+        else:
+            return self.data_sheet.add_rows(map(self._row_values, rows))
+
+    @contextmanager
+    def batch(self, compare_cols=list()):
+        """
+            Buffers the rows added with add and add_rows
+
+            with workorder.batch():
+                for row in rows:
+                    workorder.add(row)
+
+            on exit, rows not already in the sheet (see add_rows)
+            are written in one block and the workbook is saved once.
+            if an error is raised, nothing is written or saved.
+        """
 
-        self.data_sheet.add_row(**row_data)
+        self._batch = list()
+        try:
+            yield self
+        except:
+            self._batch = None
+            raise
+
+        rows, self._batch = self._batch, None
+        if self.data_sheet.add_rows(rows, compare_cols):
+            self.save()
+
+    def _row_values(self, row):
+        # values of ADD_KEYS from row, placed by data_sheet's header
+        mapping = self._mappings.get(row.header)
+        if mapping is None:
+            mapping = self._mappings[row.header] = [
+                (self.data_sheet.header.get_index(key), row.header.get_index(key))
+                for key in ADD_KEYS
+            ]
+
+        values = [None] * self._width
+        for index, source_index in mapping:
+            values[index] = row[source_index]
+
+        return values
 
 
 class WorkOrderJobData:
     # get all data for work orders for a given structure
     # i.e. '1180078B'
+    #
+    # work order files are read from disk (read-only, no Excel),
+    # workers at a time, and merged in file name order
+    #
+    # use_index: answer from the year's WorkOrderIndex, which
+    #            only reads files that changed since it was stored
 
-    def __init__(self, job):
+    def __init__(self, job, workers=None, use_index=False):
         JobParser(job, assign_to=self)
+
+        if use_index:
+            self._data = year_index(self.job_year, workers).job_data(self.job)
+            return
+
         glob_path = join(
             WORKORDER_DIR,
             self.job_year + FOLDER_SUFFIX,
             "{}*.xls".format(job))
 
+        paths = sorted(dir_index.glob(glob_path))
+
         self._data = dict()
-        for path in glob(glob_path):
-            # JobParser can parse files starting with job-shipment
-            file = WorkOrder(basename(path))
-
-            for row in file.data_sheet.iter_rows():
-                if row.mark in self._data:
-                    stored = self._data[row.mark]
-
-                    # update grade and operations, if not None
-                    stored.matl = stored.matl or row.matl
-                    stored.remark = stored.remark or row.remark
-                    stored.op2 = stored.op2 or row.op2
-                    stored.op3 = stored.op3 or row.op3
-                    stored.op4 = stored.op4 or row.op4
-                else:
-                    self._data[row.mark] = row
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # results are in the order of paths, regardless of
+            # the order that files finish reading
+            for rows in pool.map(read_workorder, paths):
+                merge_rows(self._data, rows)
 
     def __getattr__(self, name):
         if name in self._data:
@@ -98,3 +166,197 @@ class WorkOrderJobData:
 
     def get_part(self, mark):
         return self._data.get(mark, None)
+
+
+class WorkOrderIndex:
+
+    """
+        WorkOrderIndex: Work order rows of a year folder, by job and mark
+
+        Rows are merged per job the same as WorkOrderJobData.
+        The rows of each file are stored in index_cache with the
+        file's fingerprint; update() only reads files that were
+        added or changed since, and drops files that were removed.
+
+        The folder is listed through dir_index and rescanned at most
+        once per dir_index.ttl seconds (update(force=True) rescans now).
+
+        index = WorkOrderIndex(2020)
+        index.get_part('1200012A', 'A1')    -> row
+        index.find('A1')                    -> {job: row}
+    """
+
+    def __init__(self, year, workers=None):
+        self.year = str(year)
+        self.folder = join(WORKORDER_DIR, self.year + FOLDER_SUFFIX)
+        self.workers = workers
+
+        # path -> (fingerprint, header, rows)
+        self.files = dict()
+        self.jobs = dict()      # job -> {mark: row}
+        self.marks = dict()     # mark -> [job]
+
+        self._scanned = None        # time of last scan
+        self._built = False
+        self._persisted = False     # stored in index_cache
+
+        self.update()
+
+    def update(self, force=False):
+        """
+            Reads the files added or changed since the index was stored
+
+            returns the paths read
+        """
+
+        if not force and self._scanned is not None and monotonic() - self._scanned < dir_index.ttl:
+            return list()
+
+        if not self.files:
+            stored = index_cache.get_entry(self.folder)
+            if stored is not None:
+                self.files = stored[1]
+                self._persisted = True
+
+        # fingerprints of the folder's files, stat-ed workers at a time
+        paths = [path for path in dir_index.files(self.folder) if path.lower().endswith('.xls')]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            current = {path: _fingerprint for path, _fingerprint in zip(paths, pool.map(try_fingerprint, paths))
+                       if _fingerprint is not None}
+        self._scanned = monotonic()
+
+        changed = sorted(path for path, _fingerprint in current.items()
+                         if path not in self.files or self.files[path][0] != _fingerprint)
+        removed = [path for path in self.files if path not in current]
+
+        for path in removed:
+            del self.files[path]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path, sheet in zip(changed, pool.map(try_read_sheet, changed)):
+                if sheet is not None:
+                    self.files[path] = (current[path], sheet.header.header, sheet.get_rows())
+                else:
+                    # retried next update
+                    self.files.pop(path, None)
+
+        if changed or removed or not self._persisted:
+            index_cache.set(self.folder, self.files)
+            self._persisted = True
+
+        if changed or removed or not self._built:
+            self._build()
+
+        return changed
+
+    def _build(self):
+        self._built = True
+
+        headers = dict()    # header text -> HeaderParser
+
+        job_files = defaultdict(list)
+        for path in sorted(self.files):
+            try:
+                job = JobParser(basename(path)).job
+            except ValueError:
+                continue
+
+            job_files[job].append(path)
+
+        self.jobs = dict()
+        self.marks = defaultdict(list)
+        for job, paths in job_files.items():
+            data = self.jobs[job] = dict()
+
+            for path in paths:
+                _fingerprint, header_rows, rows = self.files[path]
+
+                key = repr(header_rows)
+                if key not in headers:
+                    headers[key] = HeaderParser(header=header_rows)
+                    headers[key].add_header_aliases(HEADER_ALIASES)
+
+                header = headers[key]
+                merge_rows(data, [header.parse_row(list(row)) for row in rows])
+
+            for mark in data:
+                self.marks[mark].append(job)
+
+    def job_data(self, job):
+        return self.jobs.get(JobParser(job).job, dict())
+
+    def get_part(self, job, mark):
+        return self.job_data(job).get(mark, None)
+
+    def find(self, mark):
+        # mark's rows across every job in the year
+        return {job: self.jobs[job][mark] for job in self.marks.get(mark, [])}
+
+
+# year -> WorkOrderIndex (see year_index)
+year_indexes = dict()
+
+
+def year_index(year, workers=None):
+    """
+        Returns the WorkOrderIndex of year,
+        updated if it was already loaded
+    """
+
+    year = str(year)
+    if year in year_indexes:
+        year_indexes[year].update()
+    else:
+        year_indexes[year] = WorkOrderIndex(year, workers)
+
+    return year_indexes[year]
+
+
+def read_workorder(path):
+    """
+        Reads the rows of a work order file
+        without Excel (see FileBook)
+    """
+
+    return list(read_workorder_sheet(path).iter_rows())
+
+
+def read_workorder_sheet(path):
+    book = FileBook(path)
+    sheet = FileSheetReader(book.sheets[DATA_SHEET], header_range=HEADER_RANGE)
+    sheet.add_header_aliases(HEADER_ALIASES)
+
+    return sheet
+
+
+def try_read_sheet(path):
+    try:
+        return read_workorder_sheet(path)
+    except Exception:
+        logging.exception("Error reading work order {}".format(basename(path)))
+        return None
+
+
+def try_fingerprint(path):
+    try:
+        return fingerprint(path)
+    except OSError:
+        # removed since listed
+        return None
+
+
+def merge_rows(data, rows):
+    # merge rows into data (mark -> row)
+    # first non-null value is kept for grade and operations
+    for row in rows:
+        if row.mark in data:
+            stored = data[row.mark]
+
+            # update grade and operations, if not None
+            stored.matl = stored.matl or row.matl
+            stored.remark = stored.remark or row.remark
+            stored.op2 = stored.op2 or row.op2
+            stored.op3 = stored.op3 or row.op3
+            stored.op4 = stored.op4 or row.op4
+        else:
+            data[row.mark] = row
@@ -0,0 +1,317 @@
+
+"""
+    Timing and counters for the calls that a run spends its time in:
+    Excel reads/writes, SNDB queries and monday GraphQL calls
+
+    Disabled by default; while disabled, timer() returns a shared
+    no-op timer and nothing is recorded.
+
+    Enable with:
+        instrument.enable()                     # text report to stderr at exit
+        instrument.enable('run.json')           # JSON report to file at exit
+    or by setting PRODCTRLCORE_INSTRUMENT to '1' (text to stderr)
+    or to a file path (.json for a JSON report)
+
+    Record with:
+        with instrument.timer('excel.read') as t:
+            rows = rng.value
+            t.add(rows=len(rows))
+"""
+
+import sys
+import json
+import atexit
+import threading
+
+from bisect import bisect_left
+from os import getenv
+from time import perf_counter
+
+INSTRUMENT_ENV = 'PRODCTRLCORE_INSTRUMENT'
+
+# latency histogram bucket upper bounds (ms); last bucket is unbounded
+BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class OperationStats:
+
+    """
+        OperationStats: Counters of one operation
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0            # seconds
+        self.min = None
+        self.max = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+        self.rows = 0
+        self.bytes = 0
+        self.complexity = 0
+
+    def add_time(self, elapsed, error=False):
+        self.count += 1
+        self.errors += bool(error)
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.min = elapsed if self.min is None else min(self.min, elapsed)
+        self.histogram[bisect_left(BUCKETS, elapsed * 1000)] += 1
+
+    def add(self, rows=0, bytes=0, complexity=0):
+        self.rows += rows
+        self.bytes += bytes
+        self.complexity += complexity
+
+    def to_dict(self):
+        histogram = dict()
+        for bound, count in zip(BUCKETS + ['inf'], self.histogram):
+            if count:
+                histogram['<={}ms'.format(bound)] = count
+
+        return dict(
+            count=self.count,
+            errors=self.errors,
+            total_s=round(self.total, 6),
+            mean_ms=round(self.total / self.count * 1000, 3) if self.count else None,
+            min_ms=round(self.min * 1000, 3) if self.min is not None else None,
+            max_ms=round(self.max * 1000, 3),
+            histogram=histogram,
+            rows=self.rows,
+            bytes=self.bytes,
+            complexity=self.complexity,
+        )
+
+
+class Recorder:
+
+    """
+        Recorder: Operation name -> OperationStats
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats = dict()
+        self._lock = threading.Lock()
+        self._report_registered = False
+
+    def timer(self, name):
+        if not self.enabled:
+            return null_timer
+
+        return Timer(self, name)
+
+    def record(self, name, elapsed=None, error=False, **counters):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = OperationStats()
+
+            if elapsed is not None:
+                stats.add_time(elapsed, error)
+            stats.add(**counters)
+
+    def reset(self):
+        with self._lock:
+            self.stats = dict()
+
+    def to_dict(self):
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self.stats.items())}
+
+    def report(self, format='text'):
+        data = self.to_dict()
+
+        if format == 'json':
+            return json.dumps(data, indent=2)
+
+        lines = ["{:<32} {:>8} {:>10} {:>10} {:>10} {:>10} {:>12} {:>10}".format(
+            'operation', 'count', 'total s', 'mean ms', 'max ms', 'rows', 'bytes', 'complexity')]
+        for name, stats in data.items():
+            lines.append("{:<32} {:>8} {:>10.3f} {:>10} {:>10} {:>10} {:>12} {:>10}".format(
+                name, stats['count'], stats['total_s'], stats['mean_ms'] or '-',
+                stats['max_ms'], stats['rows'], stats['bytes'], stats['complexity']))
+
+        return '\n'.join(lines)
+
+    def write_report(self, path=None, format=None):
+        if not self.stats:
+            return
+
+        if format is None:
+            format = 'json' if path and path.endswith('.json') else 'text'
+
+        report = self.report(format)
+        if path:
+            with open(path, 'w') as report_stream:
+                report_stream.write(report + '\n')
+        else:
+            sys.stderr.write(report + '\n')
+
+    def enable(self, path=None, format=None, report_at_exit=True):
+        self.enabled = True
+
+        if report_at_exit and not self._report_registered:
+            atexit.register(self.write_report, path, format)
+            self._report_registered = True
+
+    def disable(self):
+        self.enabled = False
+
+
+class Timer:
+
+    __slots__ = ('recorder', 'name', 'start', 'counters')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.counters = dict()
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = perf_counter() - self.start
+        self.recorder.record(self.name, elapsed, error=exc_type is not None, **self.counters)
+
+    def add(self, **counters):
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+class NullTimer:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+    def add(self, **counters):
+        pass
+
+
+class CursorProxy:
+
+    """
+        CursorProxy: Times execute and counts rows fetched
+        of a DB-API cursor (i.e. pyodbc)
+    """
+
+    def __init__(self, cursor, name):
+        self._cursor = cursor
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._cursor.__exit__(*exc_info)
+
+    def __iter__(self):
+        for row in self._cursor:
+            recorder.record(self._name + '.fetch', rows=1)
+            yield row
+
+    def execute(self, *args, **kwargs):
+        with recorder.timer(self._name + '.execute'):
+            self._cursor.execute(*args, **kwargs)
+
+        return self
+
+    def executemany(self, *args, **kwargs):
+        with recorder.timer(self._name + '.executemany'):
+            self._cursor.executemany(*args, **kwargs)
+
+        return self
+
+    def fetchone(self):
+        with recorder.timer(self._name + '.fetch') as t:
+            row = self._cursor.fetchone()
+            t.add(rows=row is not None)
+
+        return row
+
+    def fetchmany(self, *args):
+        with recorder.timer(self._name + '.fetch') as t:
+            rows = self._cursor.fetchmany(*args)
+            t.add(rows=len(rows))
+
+        return rows
+
+    def fetchall(self):
+        with recorder.timer(self._name + '.fetch') as t:
+            rows = self._cursor.fetchall()
+            t.add(rows=len(rows))
+
+        return rows
+
+
+class ConnectionProxy:
+
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._connection.__exit__(*exc_info)
+
+    def cursor(self):
+        return CursorProxy(self._connection.cursor(), self._name)
+
+    def commit(self):
+        with recorder.timer(self._name + '.commit'):
+            return self._connection.commit()
+
+
+def wrap_connection(connection, name='sql'):
+    """
+        Returns connection with its cursors instrumented
+        (connection itself if instrumentation is disabled)
+    """
+
+    if not recorder.enabled:
+        return connection
+
+    return ConnectionProxy(connection, name)
+
+
+null_timer = NullTimer()
+
+# shared recorder
+recorder = Recorder()
+
+timer = recorder.timer
+record = recorder.record
+enable = recorder.enable
+disable = recorder.disable
+report = recorder.report
+
+
+def is_enabled():
+    return recorder.enabled
+
+
+if getenv(INSTRUMENT_ENV):
+    _target = getenv(INSTRUMENT_ENV)
+    enable(None if _target.lower() in ('1', 'true', 'text', 'json') else _target,
+           'json' if _target.lower() == 'json' else None)
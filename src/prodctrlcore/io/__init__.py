@@ -1,2 +1,5 @@
 from .header import HeaderParser, ParsedRow
-from .jobfile import JobParser, JobBookReader, JobSheetReader
+from .xlfile import FileBook, FileSheet, FileRange
+from .xlapp import AppPool, app_pool
+from .jobfile import JobParser, JobBook, JobBookReader, JobSheetReader
+from .jobfile import FileJobBookReader, FileSheetReader, SheetReader
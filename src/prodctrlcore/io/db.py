@@ -1,9 +1,10 @@
 
 import os
-import pyodbc
 
 from string import Template
 
+from prodctrlcore import instrument
+
 SNDB_PRD = "HIIWINBL18"
 SNDB_DEV = "HIIWINBL5"
 
@@ -20,6 +21,10 @@ cs_kwargs = dict(
 
 
 def get_sndb_conn(dev=False, **kwargs):
+    # imported here so that modules using SNDB can be imported
+    # (and given other DB-API cursors) without unixODBC installed
+    import pyodbc
+
     cs_kwargs.update(kwargs)
 
     if dev:
@@ -28,4 +33,5 @@ def get_sndb_conn(dev=False, **kwargs):
 
     connection_string = CONN_STR_TEMPLATE.substitute(**cs_kwargs)
 
-    return pyodbc.connect(connection_string)
+    # queries are timed when instrumentation is enabled
+    return instrument.wrap_connection(pyodbc.connect(connection_string), 'sndb')
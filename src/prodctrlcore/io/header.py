@@ -4,6 +4,8 @@ import inflection
 from xlwings import Range
 from re import compile as regex
 
+from .xlfile import FileRange
+
 PARAM_RE = regex(r'(?P<text>[a-zA-Z_]+)(?P<id>[0-9]*)')
 
 
@@ -37,19 +39,55 @@ class HeaderParser:
             self.header = rng.value
 
         self.indexes = dict()
+        self.names = dict()         # column index -> header text
+        self._columns = dict()      # column key -> (text, id)
+        self._header_keys = set()   # column keys of header text (not aliases)
+        self._inferred = dict()     # inferred key -> index (None if no match)
+        self._row_type = None
         self._init_header()
 
     def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
         return self.get_index(name)
 
     def get_index(self, key):
         try:
-            index = self.indexes[key]
+            return self.indexes[key]
         except KeyError:
-            index = self.infer_key(key)
+            pass
+
+        try:
+            index = self._inferred[key]
+        except KeyError:
+            try:
+                index = self.infer_key(key)
+            except KeyError:
+                index = None
+            self._inferred[key] = index
+
+        if index is None:
+            raise KeyError(key)
 
         return index
 
+    def compile(self, keys):
+        """
+            Resolves keys (i.e. aliases or partial header names)
+            up front so that lookups are a single dict hit
+
+            keys that cannot be inferred are skipped
+        """
+
+        for key in keys:
+            try:
+                self.add_column_index(key, self.get_index(key))
+            except KeyError:
+                pass
+
+        return self
+
     def _init_header(self):
         if type(self.header[0]) is not list:
             # header is single row
@@ -60,11 +98,18 @@ class HeaderParser:
                 if column:
                     # not empty cell
                     self.add_column_index(column, index)
+                    self._header_keys.update((column, column.lower(), to_(column)))
 
     def add_column_index(self, key, index):
-        self.indexes[key] = index
-        self.indexes[key.lower()] = index
-        self.indexes[to_(key)] = index
+        self.names.setdefault(index, key)
+
+        for _key in (key, key.lower(), to_(key)):
+            self.indexes[_key] = index
+            self._columns[_key] = parse_param(_key)
+
+        # new columns can change the outcome of inference
+        self._inferred.clear()
+        self._row_type = None
 
     def add_header_aliases(self, mapping=dict(), **kwargs):
         mapping.update(kwargs)
@@ -79,27 +124,34 @@ class HeaderParser:
         except KeyError:
             pass
 
+    @property
+    def row_type(self):
+        """
+            ParsedRow subclass generated for this header
+
+            regenerated after columns or aliases are added
+        """
+
+        if self._row_type is None:
+            self._row_type = make_row_type(self)
+
+        return self._row_type
+
     def parse_row(self, row):
-        if type(row) is Range:
+        if isinstance(row, (Range, FileRange)):
             row = row.value
 
-        return ParsedRow(row, self)
+        return self.row_type(row)
 
     def infer_key(self, key):
-        key = key.lower()
-
-        _m = PARAM_RE.match(key)
-        key_text = _m.group('text')
-        key_id = _m.group('id')
+        key_text, key_id = parse_param(key.lower())
+        if key_text is None:
+            raise KeyError(key)
 
         # infer based on key that has the
         # - str.startswith match
         # - same trailing ID (if applicable)
-        for col in self.indexes:
-            _m = PARAM_RE.match(col)
-            col_text = _m.group('text')
-            col_id = _m.group('id')
-
+        for col, (col_text, col_id) in self._columns.items():
             if key_id == col_id:
                 if col_text.startswith(key_text):
                     return self.indexes[col]
@@ -107,38 +159,72 @@ class HeaderParser:
         # infer based on key that has the
         # - key is found in column text
         # - same trailing ID (if applicable)
-        # - CRITICAL: can only have one match
-        match = None
-        for col in self.indexes:
-            _m = PARAM_RE.match(col)
-            col_text = _m.group('text')
-            col_id = _m.group('id')
-
+        # - CRITICAL: can only have one best match
+        #   header columns are preferred over aliases,
+        #   then the shortest column text
+        #   i.e. 'matl' is 'Material' over alias 'MaterialMaster'
+        matches = dict()    # index -> best (is alias, text length)
+        for col, (col_text, col_id) in self._columns.items():
             if key_id == col_id:
                 if semi_sequential_match(key_text, col_text):
-                    if match:
-                        raise KeyError(
-                            "Multiple matching keys found when inferring column headers. Key={}".format(key))
-                    return self.indexes[col]
+                    rank = (col not in self._header_keys, len(col_text))
+                    index = self.indexes[col]
+                    matches[index] = min(rank, matches.get(index, rank))
+
+        if not matches:
+            raise KeyError(key)
+
+        best = min(matches.values())
+        found = [index for index, rank in matches.items() if rank == best]
+        if len(found) > 1:
+            raise KeyError(
+                "Multiple matching keys found when inferring column headers. Key={}".format(key))
 
-        raise KeyError
+        return found[0]
 
 
 class ParsedRow:
 
-    def __init__(self, row, header):
-        self._data = row
-        self.header = header
+    """
+        ParsedRow: A row of data accessed by header text
+
+        HeaderParser.parse_row returns a subclass of ParsedRow
+        (see make_row_type) where each indexed column and alias
+        is a property bound to its column index. Any other
+        names fall back to HeaderParser inference.
+    """
+
+    __slots__ = ('_data', '__dict__')
+
+    header = None
+
+    def __init__(self, row, header=None):
+        object.__setattr__(self, '_data', row)
+
+        if header is not None and header is not self.header:
+            self.__dict__['header'] = header
 
     def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
         return self.get_item(name)
 
     def __setattr__(self, name, value):
+        if name.startswith('_'):
+            return object.__setattr__(self, name, value)
+
         try:
             index = self.header.get_index(name)
             self._data[index] = value
         except KeyError:
-            self.__dict__[name] = value
+            object.__setattr__(self, name, value)
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
 
     def __eq__(self, other):
         for i in self.header.indexes.values():
@@ -147,16 +233,52 @@ class ParsedRow:
 
         return True
 
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, self._data)
+
     def get_item(self, header_val):
         index = self.header.get_index(header_val)
 
         return self._data[index]
 
 
+def make_row_type(header):
+    """
+        Builds a ParsedRow subclass with a property
+        for each of the header's indexes
+    """
+
+    namespace = dict(__slots__=(), header=header)
+    for key, index in header.indexes.items():
+        if key.isidentifier() and not hasattr(ParsedRow, key):
+            namespace[key] = column_property(index)
+
+    return type(ParsedRow.__name__, (ParsedRow,), namespace)
+
+
+def column_property(index):
+    def fget(row):
+        return row._data[index]
+
+    def fset(row, value):
+        row._data[index] = value
+
+    return property(fget, fset)
+
+
 def to_(text):
     return inflection.parameterize(text, separator='_')
 
 
+def parse_param(text):
+    _m = PARAM_RE.match(text)
+
+    if _m is None:
+        return None, None
+
+    return _m.group('text'), _m.group('id')
+
+
 def semi_sequential_match(find_str, within_str):
     """
         Returns if find string exists in
@@ -172,9 +294,8 @@ def semi_sequential_match(find_str, within_str):
     current_char = find_chars.pop(0)
     for char in within_str:
         if char == current_char:
-            if find_chars:
-                char = find_chars.pop(0)
-            else:
-                return False
+            if not find_chars:
+                return True
+            current_char = find_chars.pop(0)
 
-    return True
+    return False
@@ -1,11 +1,18 @@
 
+import numpy
+
 from os import makedirs
 from os.path import join, exists
+from pandas import DataFrame
 from xlwings import Book, Sheet
 
 from re import compile as regex
 
 from . import HeaderParser, ParsedRow
+from .xlfile import FileBook, FileSheet
+from .xlapp import app_pool
+from prodctrlcore import instrument
+from prodctrlcore.utils import dir_index
 
 
 JOBSHIP_RE = regex(
@@ -32,16 +39,17 @@ class JobParser:
             assign_to.__dict__.update(self.__dict__)
 
 
-class JobBookReader(Book):
+class JobBook:
     """
-        Excel Book reader for jobs that are stored by year
+        Base for workbooks of jobs that are stored by year
         i.e. directory > 2020 > Job-Shipment.xls
 
-        if file does not exist,
-        template file will be created and saved in place
+        Paired with a workbook backend:
+            JobBookReader:      Excel, through xlwings
+            FileJobBookReader:  read from disk, no Excel
     """
 
-    def __init__(self, job, shipment=None, **kwargs):
+    def init_job(self, job, shipment=None, **kwargs):
         JobParser(job, shipment, assign_to=self)
 
         self.job_shipment = '{}-{}'.format(self.job, self.shipment)
@@ -53,17 +61,6 @@ class JobBookReader(Book):
         self.root_dir = kwargs.get('directory')
         self.template = join(self.root_dir, kwargs.get('template'))
 
-        if exists(self.file):
-            self.__init_file__(self.file, **kwargs)
-        else:
-            self.__init_file__(self.template, **kwargs)
-            if not exists(self.year_folder):
-                makedirs(self.year_folder)
-            self.save(self.file)
-
-    def __init_file__(self, file, **kwargs):
-        super().__init__(file, **kwargs)
-
     @property
     def year_folder(self):
         return join(self.root_dir, self.job_year + self.folder_suffix)
@@ -74,104 +71,403 @@ class JobBookReader(Book):
 
         return join(self.root_dir, self.year_folder, xl_file)
 
+
+class JobBookReader(JobBook, Book):
+    """
+        Excel Book reader for jobs that are stored by year
+        i.e. directory > 2020 > Job-Shipment.xls
+
+        if file does not exist,
+        template file will be created and saved in place
+
+        the workbook is opened in an Excel instance borrowed
+        from app_pool, which is returned by close()
+
+        with WorkOrder(job) as wo:
+            ...
+    """
+
+    def __init__(self, job, shipment=None, **kwargs):
+        self.init_job(job, shipment, **kwargs)
+
+        # checked live (not through dir_index): a stale listing
+        # would save the template over a file created since
+        if exists(self.file):
+            self.__init_file__(self.file)
+        else:
+            self.__init_file__(self.template)
+            try:
+                if not exists(self.year_folder):
+                    makedirs(self.year_folder, exist_ok=True)
+                    dir_index.invalidate(self.root_dir)
+                self.save(self.file)
+            except:
+                self.close()
+                raise
+            dir_index.invalidate(self.year_folder)
+
+    def __init_file__(self, file):
+        self.xl_app = app_pool.acquire()
+
+        try:
+            Book.__init__(self, impl=self.xl_app.books.open(file).impl)
+        except:
+            app_pool.release(self.xl_app)
+            self.xl_app = None
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.xl_app is None:
+            # already closed
+            return
+
+        try:
+            Book.close(self)
+        finally:
+            app_pool.release(self.xl_app)
+            self.xl_app = None
+
     def sheet(self, sheet_name, **kwargs):
         sheet = self.sheets[sheet_name].impl
 
         return JobSheetReader(impl=sheet, **kwargs)
 
 
-class JobSheetReader(Sheet):
+class FileJobBookReader(JobBook, FileBook):
+    """
+        Read-only Book reader for jobs that are stored by year,
+        read directly from disk (see FileBook)
 
-    def __init__(self, sheet=None, **kwargs):
-        if 'impl' in kwargs:
-            super().__init__(impl=kwargs['impl'])
-        else:
-            super().__init__(sheet)
+        if file does not exist, FileNotFoundError is raised
 
+        saving is not supported: save() raises PermissionError
+        (use JobBookReader to write to the workbook)
+    """
+
+    def __init__(self, job, shipment=None, **kwargs):
+        self.init_job(job, shipment, **kwargs)
+
+        if not dir_index.isfile(self.file):
+            raise FileNotFoundError(self.file)
+
+        FileBook.__init__(self, self.file)
+
+    def sheet(self, sheet_name, **kwargs):
+        return FileSheetReader(self.sheets[sheet_name], **kwargs)
+
+
+class SheetReader:
+    """
+        Header based reading and writing of a sheet's data block
+
+        Paired with a sheet backend:
+            JobSheetReader:     Excel, through xlwings
+            FileSheetReader:    read from disk, no Excel
+    """
+
+    def init_reader(self, **kwargs):
         if 'header_range' in kwargs:
             self.set_header(**kwargs)
         else:
             self.header = HeaderParser(sheet=self, **kwargs)
+            self.first_col = 1
             self.first_data_row = 2
 
+        # compare column indexes -> set of row keys in sheet
+        self._row_index = dict()
+
+        # in-memory copy of the data block (see refresh)
+        self._snapshot = None
+        self._bounds = None
+
     def set_header(self, header_range, first_data_row=0):
         self.first_data_row = first_data_row
 
         if type(header_range) is not list:
-            header_rng = [header_rng]
+            header_range = [header_range]
 
-        _header = list()
+        ranges = list()
         for range in header_range:
             _rng = self.range(range)
-            _header.extend(_rng.value)
+            if _rng.count == 1:
+                _rng = _rng.expand('right')
+
+            ranges.append(_rng)
             if self.first_data_row <= _rng.last_cell.row:
                 self.first_data_row = _rng.last_cell.row + 1
 
+        # header indexes are relative to the first header column
+        self.first_col = min(_rng.column for _rng in ranges)
+
+        # each range is a header row, placed at its own columns
+        # i.e. ['C1:N1', 'O2:N2']: N2 and O2 are columns N and O
+        _header = list()
+        for _rng in ranges:
+            offset = _rng.column - self.first_col
+            _header.append([None] * offset + _rng.options(ndim=1).value)
+
         self.header = HeaderParser(header=_header)
+        self._bounds = None
+
+    def add_header_aliases(self, mapping=dict(), **kwargs):
+        self.header.add_header_aliases(mapping, **kwargs)
+        self._bounds = None
+
+    def refresh(self):
+        """
+            Drops the in-memory snapshot of the data block and
+            the row indexes, so they are reread from the sheet
+
+            needed only if the sheet is changed other than
+            through this reader
+        """
+
+        self._snapshot = None
+        self._bounds = None
+        self._row_index.clear()
 
     def _data_range(self):
-        start = (self.first_data_row, self.min_col)
-        end = (self.first_data_row, self.max_col)
+        start = (self.first_data_row, self.first_col)
+        end = (self.first_data_row, self.first_col + self.max_col)
 
         return self.range(start, end).expand('down')
 
     @property
     def min_col(self):
-        return min(self.header.indexes.values())
+        return self._get_bounds()[0]
 
     @property
     def max_col(self):
-        return max(self.header.indexes.values())
+        return self._get_bounds()[1]
+
+    def _get_bounds(self):
+        if self._bounds is None:
+            indexes = self.header.indexes.values()
+            self._bounds = (min(indexes), max(indexes))
+
+        return self._bounds
+
+    @property
+    def next_row(self):
+        # sheet row that the next added row is written to
+        return self.first_data_row + len(self._rows())
+
+    def _rows(self):
+        # data block snapshot, shared (do not modify)
+        if self._snapshot is None:
+            with instrument.timer('excel.read') as timer:
+                rows = self._data_range().options(ndim=2).value
+                timer.add(rows=len(rows))
+
+            # expanding from an empty row returns that row
+            while rows and all(value is None for value in rows[-1]):
+                rows.pop()
+
+            self._snapshot = rows
+
+        return self._snapshot
 
     def get_rows(self):
-        return self._data_range().value
+        return [list(row) for row in self._rows()]
 
     def iter_rows(self):
         for row in self.get_rows():
             yield self.header.parse_row(row)
 
-    def add_row(self, row=None, compare_cols=list(), **kwargs):
-        if type(row) is ParsedRow:
-            new_row = row
+    def to_columns(self, columns=None, dtypes=dict()):
+        """
+            Reads the data block in one call and returns
+            a dict of column name -> numpy array
+
+            columns: header names or aliases to export
+                     (default: every header column, by header text)
+            dtypes:  dtype hints, keyed by column name or alias
+                     (default: object)
+        """
+
+        transposed = list(zip(*self._rows()))
+
+        # resolve dtype hints to column indexes
+        dtype_by_index = dict()
+        for key, dtype in dtypes.items():
+            dtype_by_index[self.header.get_index(key)] = dtype
+
+        data = dict()
+        for name, index in self._export_columns(columns):
+            if transposed:
+                values = transposed[index]
+            else:
+                values = ()
+
+            dtype = dtype_by_index.get(index, object)
+            data[name] = numpy.array(values, dtype=dtype)
+
+        return data
+
+    def to_frame(self, columns=None, dtypes=dict()):
+        """
+            Reads the data block into a pandas DataFrame
+
+            see to_columns for arguments; columns without
+            a dtype hint have their type inferred
+        """
+
+        frame = DataFrame(self.to_columns(columns, dtypes))
+
+        untyped = [name for name in frame.columns if name not in dtypes]
+        frame[untyped] = frame[untyped].infer_objects()
+
+        return frame
+
+    def _export_columns(self, columns=None):
+        if columns is None:
+            names = sorted(self.header.names.items())
+            columns = [(name, index) for index, name in names]
         else:
-            new_row = self.construct_row(row, **kwargs)
+            columns = [(key, self.header.get_index(key)) for key in columns]
+
+        # header text is not guaranteed to be unique
+        exported = set()
+        for name, index in columns:
+            if name in exported:
+                name = '{}_{}'.format(name, index)
+            exported.add(name)
+
+            yield name, index
+
+    def add_row(self, row=None, compare_cols=list(), **kwargs):
+        if not isinstance(row, ParsedRow):
+            row = self.construct_row(row, **kwargs)
+
+        self.add_rows([row], compare_cols)
+
+    def add_rows(self, rows, compare_cols=list()):
+        """
+            Adds rows that are not already in the sheet,
+            writing them as a single block below the data
+
+            rows: ParsedRow, list of values or dict of header -> value
+            compare_cols: see row_index
+
+            returns the rows written
+        """
+
+        indexes, existing = self.row_index(compare_cols)
 
-        # in case using compare_cols (only need to do this one once)
-        new_cols = map(new_row.get_item, compare_cols)
+        new_rows = list()
+        new_keys = set()
+        for row in rows:
+            row = self._as_row(row)
 
-        # check if row already exists
-        for self_row in self.iter_rows():
+            key = row_key(row, indexes)
+            if key in existing or key in new_keys:
+                continue
 
-            # compares selected columns to compare
-            if compare_cols:
-                self_cols = map(self_row.get_item, compare_cols)
+            new_keys.add(key)
+            new_rows.append(row)
 
-                if new_cols == self_cols:
-                    break
+        if not new_rows:
+            return new_rows
 
-            # compares all indexed columns
-            elif self_row == new_row:
-                break
+        width = max(len(row._data) for row in new_rows)
+        block = list()
+        for row in new_rows:
+            block.append(list(row._data) + [None] * (width - len(row._data)))
 
-        # row not in sheet
+        start = (self.next_row, self.first_col)
+        with instrument.timer('excel.write') as timer:
+            self.range(start).value = block
+            timer.add(rows=len(block))
+
+        self._rows().extend(block)
+        for row in new_rows:
+            self._index_row(row)
+
+        return new_rows
+
+    def _as_row(self, row):
+        if isinstance(row, ParsedRow):
+            return row
+
+        if isinstance(row, dict):
+            return self.construct_row(**row)
+
+        return self.construct_row(row)
+
+    def row_index(self, compare_cols=list()):
+        """
+            Returns the column indexes compared and the set of
+            row keys in the sheet for those columns
+
+            compare_cols: header names or aliases to compare
+                          (default: all indexed columns)
+
+            index is built from the sheet once per set of
+            columns and kept up to date by add_row
+        """
+
+        if compare_cols:
+            indexes = tuple(map(self.header.get_index, compare_cols))
         else:
-            row_index = self._data_range().last_cell.row + 1
+            indexes = tuple(sorted(set(self.header.indexes.values())))
+
+        if indexes not in self._row_index:
+            self._row_index[indexes] = set(
+                row_key(row, indexes) for row in self._rows())
+
+        return indexes, self._row_index[indexes]
 
-            col_index = self._data_range().column
-            self.range(row_index, col_index).value = new_row._data
+    def _index_row(self, row):
+        for indexes, existing in self._row_index.items():
+            existing.add(row_key(row, indexes))
 
     def construct_row(self, row=None, **kwargs):
+        max_index = max(self.header.indexes.values())
+
         if row:
-            return ParsedRow(row, self.header)
+            # pad so that every indexed column exists
+            row = list(row) + [None] * (max_index + 1 - len(row))
+
+            return self.header.parse_row(row)
 
         # construct row from scratch
-        max_index = max(self.header.indexes.values())
         blanks = [None] * (max_index + 1)
 
-        row = ParsedRow(blanks, self.header)
+        row = self.header.parse_row(blanks)
 
         for key, value in kwargs.items():
             index = self.header.get_index(key)
             row[index] = value
 
         return row
+
+
+class JobSheetReader(SheetReader, Sheet):
+
+    def __init__(self, sheet=None, **kwargs):
+        impl = kwargs.pop('impl', None)
+        if impl is not None:
+            Sheet.__init__(self, impl=impl)
+        else:
+            Sheet.__init__(self, sheet)
+
+        self.init_reader(**kwargs)
+
+
+class FileSheetReader(SheetReader, FileSheet):
+
+    def __init__(self, sheet, **kwargs):
+        # shares cells with sheet
+        FileSheet.__init__(self, sheet.name, sheet.cells, book=sheet.book)
+
+        self.init_reader(**kwargs)
+
+
+def row_key(row, indexes):
+    return tuple(row[i] for i in indexes)
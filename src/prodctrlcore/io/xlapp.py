@@ -0,0 +1,287 @@
+
+import os
+import atexit
+import signal
+import logging
+import threading
+import xlwings
+
+from contextlib import contextmanager
+from time import monotonic
+
+from prodctrlcore import instrument
+
+logger = logging.getLogger(__name__)
+
+
+class AppPool:
+
+    """
+        AppPool: A pool of Excel instances shared by prodctrlcore readers
+
+        Borrow an instance with:
+            with app_pool.app() as xl_app:
+                wb = xl_app.books.open(xl_file)
+                ...
+
+        or open a single workbook with:
+            with app_pool.book(xl_file) as wb:
+                ...
+
+        - at most max_apps instances are started; callers wait
+          for an instance to be returned if all are in use
+        - a thread that already holds an instance is given the same
+          instance again, so nested borrows do not deadlock
+        - an instance belongs to the COM apartment of the thread that
+          started it, so it is only lent to, checked and quit from
+          that thread (during acquire and release)
+        - Excel is started, checked and quit outside the pool's lock;
+          a slot is reserved for the starting thread
+        - instances idle for idle_timeout seconds are quit
+        - instances that no longer respond are discarded
+        - instances that cannot be quit from the calling thread (their
+          thread has exited, even if still borrowed, or one is needed
+          to stay within max_apps) are terminated by process id,
+          without COM
+        - every instance is quit at interpreter exit
+    """
+
+    def __init__(self, max_apps=1, idle_timeout=300, **app_kwargs):
+        self.max_apps = max_apps
+        self.idle_timeout = idle_timeout
+
+        self.app_kwargs = dict(visible=False, add_book=False)
+        self.app_kwargs.update(app_kwargs)
+
+        self._idle = list()         # [(app, time returned)]
+        self._owners = dict()       # thread id -> [app (None while starting), borrow count]
+        self._started = dict()      # id(app) -> (thread id, pid)
+        self._cond = threading.Condition()
+
+        atexit.register(self.close)
+
+    @contextmanager
+    def app(self, timeout=None):
+        xl_app = self.acquire(timeout)
+        try:
+            yield xl_app
+        finally:
+            self.release(xl_app)
+
+    @contextmanager
+    def book(self, fullname, timeout=None):
+        """
+            Opens a workbook in a borrowed instance,
+            closing it when done
+        """
+
+        with self.app(timeout) as xl_app:
+            with instrument.timer('excel.open'):
+                wb = xl_app.books.open(fullname)
+            try:
+                yield wb
+            finally:
+                wb.close()
+
+    def acquire(self, timeout=None):
+        thread = threading.get_ident()
+
+        with self._cond:
+            if thread in self._owners:
+                self._owners[thread][1] += 1
+                return self._owners[thread][0]
+
+        # an idle instance of this thread, or a slot to start one in
+        xl_app, to_quit = self._reserve(thread, timeout)
+        self._quit_all(to_quit)
+
+        if xl_app is not None:
+            if is_alive(xl_app):
+                return xl_app
+
+            # not responding: another is started in its slot
+            with self._cond:
+                self._owners[thread][0] = None
+                to_quit = [self._forget(xl_app)]
+            self._quit_all(to_quit)
+
+        try:
+            logger.info("Starting Excel instance")
+            xl_app = xlwings.App(**self.app_kwargs)
+            pid = get_pid(xl_app)
+        except:
+            with self._cond:
+                self._owners.pop(thread, None)
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._started[id(xl_app)] = (thread, pid)
+            self._owners.setdefault(thread, [None, 1])[0] = xl_app
+
+        return xl_app
+
+    def release(self, xl_app):
+        thread = threading.get_ident()
+
+        with self._cond:
+            owned = self._owners.get(thread)
+            if owned is None or owned[0] is not xl_app:
+                raise ValueError("Excel instance was not borrowed by this thread")
+
+            owned[1] -= 1
+            if owned[1] > 0:
+                return
+
+            # checked when next borrowed
+            del self._owners[thread]
+            self._idle.append((xl_app, monotonic()))
+
+            to_quit = self._reap()
+            self._cond.notify()
+
+        self._quit_all(to_quit)
+
+    def close(self):
+        """
+            Quits every instance, including those in use
+        """
+
+        with self._cond:
+            apps = [xl_app for xl_app, _ in self._idle]
+            apps.extend(xl_app for xl_app, _ in self._owners.values() if xl_app is not None)
+
+            self._idle.clear()
+            self._owners.clear()
+
+            to_quit = [self._forget(xl_app) for xl_app in apps]
+
+        self._quit_all(to_quit)
+
+    def _reserve(self, thread, timeout=None):
+        """
+            Reserves a slot for thread, waiting up to timeout
+
+            returns (idle instance of thread or None to start one,
+                     [instances to quit])
+        """
+
+        deadline = None if timeout is None else monotonic() + timeout
+        to_quit = list()
+
+        with self._cond:
+            while True:
+                to_quit.extend(self._reap())
+
+                for xl_app, returned in reversed(self._idle):
+                    if self._started[id(xl_app)][0] == thread:
+                        self._idle.remove((xl_app, returned))
+                        self._owners[thread] = [xl_app, 1]
+                        return xl_app, to_quit
+
+                if len(self._owners) + len(self._idle) < self.max_apps:
+                    break
+
+                if self._idle:
+                    # idle instances left are of other threads
+                    # and cannot be lent to this one
+                    xl_app, _ = self._idle.pop(0)
+                    to_quit.append(self._forget(xl_app))
+                    break
+
+                wait = None if deadline is None else deadline - monotonic()
+                if wait is not None and wait <= 0:
+                    raise TimeoutError("No Excel instance available")
+                self._cond.wait(wait)
+
+            self._owners[thread] = [None, 1]
+
+        return None, to_quit
+
+    def _reap(self):
+        """
+            Takes out instances of this thread idle past idle_timeout
+            and instances of threads that have exited, idle or borrowed
+            (call with lock held)
+
+            returns [instances to quit] (see _quit_all)
+        """
+
+        now = monotonic()
+        thread = threading.get_ident()
+        running = {t.ident for t in threading.enumerate()}
+
+        to_quit = list()
+
+        idle = list()
+        for xl_app, returned in self._idle:
+            started_by = self._started[id(xl_app)][0]
+            if started_by not in running:
+                to_quit.append(self._forget(xl_app))
+            elif started_by == thread and now - returned >= self.idle_timeout:
+                to_quit.append(self._forget(xl_app))
+            else:
+                idle.append((xl_app, returned))
+
+        self._idle = idle
+
+        # borrowed by threads that exited without returning them
+        for owner in [owner for owner in self._owners if owner not in running]:
+            xl_app, _ = self._owners.pop(owner)
+            if xl_app is not None:
+                logger.warning("Excel instance was not returned by its thread")
+                to_quit.append(self._forget(xl_app))
+
+        return to_quit
+
+    def _forget(self, xl_app):
+        # (app, thread id, pid) of an instance leaving the pool
+        return (xl_app,) + self._started.pop(id(xl_app), (None, None))
+
+    def _quit_all(self, to_quit):
+        # quit through COM from the thread that started the instance,
+        # otherwise terminate its process (call without lock held)
+        for xl_app, thread, pid in to_quit:
+            if thread == threading.get_ident():
+                quit_app(xl_app, pid)
+            else:
+                kill_pid(pid)
+
+
+def is_alive(xl_app):
+    try:
+        xl_app.books.count
+        return True
+    except Exception:
+        return False
+
+
+def get_pid(xl_app):
+    try:
+        return xl_app.pid
+    except Exception:
+        logger.exception("Unable to get process id of Excel instance")
+        return None
+
+
+def quit_app(xl_app, pid=None):
+    try:
+        xl_app.quit()
+    except Exception:
+        kill_pid(pid)
+
+
+def kill_pid(pid):
+    if pid is None:
+        logger.error("Unable to quit Excel instance: process id unknown")
+        return
+
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        # already exited
+        pass
+
+
+# default pool
+app_pool = AppPool()
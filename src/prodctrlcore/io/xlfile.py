@@ -0,0 +1,391 @@
+
+from os.path import basename, splitext
+from re import compile as regex
+
+CELL_RE = regex(r'\$?(?P<col>[A-Za-z]{1,3})\$?(?P<row>[0-9]+)')
+ADDRESS_RE = regex(r'\$?[A-Za-z]{1,3}\$?[0-9]+(:\$?[A-Za-z]{1,3}\$?[0-9]+)?')
+
+
+class FileBook:
+
+    """
+        FileBook: A workbook read directly from disk (no Excel)
+
+        .xls files are read with xlrd
+        .xlsx/.xlsm files are read with openpyxl
+
+        Supports the parts of xlwings' Book/Sheet/Range api
+        that prodctrlcore uses:
+            book.sheets[name or index], iteration over book.sheets
+            sheet.range(cell or name[, cell]) -> FileRange
+            range.value, .expand(), .options(ndim=...),
+            .row, .column, .last_cell, .shape, .count
+
+        Workbooks are loaded into memory. Values can be written
+        to ranges, but the workbook is read-only: save() raises
+        PermissionError.
+    """
+
+    def __init__(self, fullname):
+        self.fullname = fullname
+        self.name = basename(fullname)
+
+        self.names = dict()     # defined name -> (sheet name, address)
+        self.sheets = FileSheets()
+
+        ext = splitext(fullname)[1].lower()
+        if ext == '.xls':
+            self._load_xls()
+        else:
+            self._load_xlsx()
+
+    def _load_xls(self):
+        import xlrd
+
+        book = xlrd.open_workbook(self.fullname, on_demand=True)
+        xls_value = xls_converter(xlrd, book.datemode)
+
+        for index in range(book.nsheets):
+            sheet = book.sheet_by_index(index)
+
+            cells = list()
+            for row in range(sheet.nrows):
+                types = sheet.row_types(row)
+                values = sheet.row_values(row)
+                cells.append([xls_value(t, v) for t, v in zip(types, values)])
+
+            self.sheets.append(FileSheet(sheet.name, cells, book=self))
+
+        # resolved while the sheets are loaded: area2d
+        # would otherwise parse an unloaded sheet again
+        for name in book.name_obj_list:
+            try:
+                _sheet, row_lo, row_hi, col_lo, col_hi = name.area2d(clipped=False)
+            except Exception:
+                # not a single area reference (i.e. constant or formula)
+                continue
+
+            address = (row_lo + 1, col_lo + 1), (row_hi, col_hi)
+            self._add_name(name.name, _sheet.name, address, name.scope)
+
+        book.release_resources()
+
+    def _load_xlsx(self):
+        import openpyxl
+
+        book = openpyxl.load_workbook(self.fullname, data_only=True)
+
+        for ws in book.worksheets:
+            cells = list()
+            for row in ws.iter_rows(values_only=True):
+                cells.append([xlsx_value(v) for v in row])
+
+            self.sheets.append(FileSheet(ws.title, cells, book=self))
+
+            print_area = ws.print_area
+            if print_area:
+                # "'Sheet'!A1:B2,..." in openpyxl >= 3.1, ['A1:B2', ...] in 3.0
+                if type(print_area) is str:
+                    print_area = print_area.split(',')
+
+                for area in print_area:
+                    ref = area.rsplit('!', 1)[-1]
+                    self._add_name('Print_Area', ws.title, ref, ws.title)
+
+        for name, defn, scope in xlsx_defined_names(book):
+            try:
+                for _sheet, ref in defn.destinations:
+                    self._add_name(name, _sheet, ref, scope)
+            except Exception:
+                # not a range reference
+                continue
+
+        book.close()
+
+    def _add_name(self, name, sheet_name, address, scope=-1):
+        # sheet scoped names are stored under (sheet, name)
+        if scope != -1:
+            if type(scope) is int:
+                scope = self.sheets[scope].name
+            name = (scope, name)
+
+        self.names[name] = (sheet_name, address)
+
+    def resolve_name(self, name, sheet=None):
+        """
+            Returns the (sheet name, address) of a defined name
+
+            names scoped to sheet take precedence
+        """
+
+        if sheet is not None and (sheet.name, name) in self.names:
+            return self.names[(sheet.name, name)]
+
+        return self.names[name]
+
+    def close(self):
+        self.sheets = FileSheets()
+
+    def save(self, path=None):
+        # read-only: values written to ranges are not kept
+        raise PermissionError(
+            "Workbooks read from file are read-only and cannot be saved: {}".format(self.name))
+
+
+class FileSheets(list):
+
+    def __getitem__(self, key):
+        if type(key) is str:
+            for sheet in self:
+                if sheet.name == key:
+                    return sheet
+
+            raise KeyError(key)
+
+        return super().__getitem__(key)
+
+
+class FileSheet:
+
+    def __init__(self, name, cells, book=None):
+        self.name = name
+        self.cells = cells
+        self.book = book
+
+    @property
+    def impl(self):
+        # for parity with xlwings.Sheet.impl
+        return self
+
+    def __repr__(self):
+        return "<FileSheet [{}]{}>".format(
+            self.book.name if self.book else '', self.name)
+
+    def range(self, cell1, cell2=None):
+        if type(cell1) is str and not ADDRESS_RE.fullmatch(cell1):
+            # defined name
+            sheet_name, cell1 = self.book.resolve_name(cell1, self)
+            if sheet_name != self.name:
+                return self.book.sheets[sheet_name].range(cell1, cell2)
+
+        start, end = self._address(cell1)
+        if cell2 is not None:
+            end = self._address(cell2)[1]
+
+        return FileRange(self, start, end)
+
+    def _address(self, address):
+        if isinstance(address, FileRange):
+            return address.start, address.end
+
+        if type(address) is tuple:
+            if type(address[0]) is tuple:
+                # (start, end)
+                return address
+
+            return address, address
+
+        return parse_address(address)
+
+    def get_value(self, row, col):
+        # 1-based, like Excel
+        if row < 1 or col < 1:
+            return None
+
+        try:
+            return self.cells[row - 1][col - 1]
+        except IndexError:
+            return None
+
+    def set_value(self, row, col, value):
+        while len(self.cells) < row:
+            self.cells.append(list())
+
+        cells = self.cells[row - 1]
+        if len(cells) < col:
+            cells.extend([None] * (col - len(cells)))
+
+        cells[col - 1] = value
+
+
+class FileRange:
+
+    def __init__(self, sheet, start, end, ndim=None):
+        self.sheet = sheet
+        self.start = start      # (row, col), 1-based
+        self.end = end
+        self.ndim = ndim
+
+    def __repr__(self):
+        return "<FileRange {} {}:{}>".format(self.sheet, self.start, self.end)
+
+    @property
+    def row(self):
+        return self.start[0]
+
+    @property
+    def column(self):
+        return self.start[1]
+
+    @property
+    def shape(self):
+        return (self.end[0] - self.start[0] + 1, self.end[1] - self.start[1] + 1)
+
+    @property
+    def count(self):
+        rows, cols = self.shape
+        return rows * cols
+
+    @property
+    def last_cell(self):
+        return FileRange(self.sheet, self.end, self.end)
+
+    def options(self, ndim=None, **kwargs):
+        return FileRange(self.sheet, self.start, self.end, ndim=ndim)
+
+    def expand(self, mode='table'):
+        (row, col), (end_row, end_col) = self.start, self.end
+        get_value = self.sheet.get_value
+
+        if mode in ('table', 'right', 'r'):
+            while get_value(row, end_col + 1) is not None:
+                end_col += 1
+
+        if mode in ('table', 'down', 'd'):
+            while get_value(end_row + 1, col) is not None:
+                end_row += 1
+
+        return FileRange(self.sheet, self.start, (end_row, end_col), self.ndim)
+
+    @property
+    def value(self):
+        (row, col), (end_row, end_col) = self.start, self.end
+        get_value = self.sheet.get_value
+
+        values = list()
+        for r in range(row, end_row + 1):
+            values.append([get_value(r, c) for c in range(col, end_col + 1)])
+
+        # same shape rules as xlwings
+        if self.ndim == 2:
+            return values
+
+        if self.ndim == 1 or len(values) == 1 or len(values[0]) == 1:
+            flat = [v for _row in values for v in _row]
+            if len(flat) == 1 and self.ndim is None:
+                return flat[0]
+
+            return flat
+
+        return values
+
+    @value.setter
+    def value(self, values):
+        row, col = self.start
+
+        if type(values) not in (list, tuple):
+            values = [[values]]
+        elif not values or type(values[0]) not in (list, tuple):
+            values = [values]
+
+        for r, _row in enumerate(values, start=row):
+            for c, value in enumerate(_row, start=col):
+                self.sheet.set_value(r, c, value)
+
+
+def parse_address(address):
+    """
+        Parses an A1 style address ('B2' or 'B2:AB2')
+        into 1-based (row, col) start and end cells
+    """
+
+    cells = [parse_cell(cell) for cell in address.split(':')]
+    start, end = cells[0], cells[-1]
+
+    # allow reversed ranges (i.e. 'O2:N2')
+    start, end = (
+        (min(start[0], end[0]), min(start[1], end[1])),
+        (max(start[0], end[0]), max(start[1], end[1])),
+    )
+
+    return start, end
+
+
+def parse_cell(cell):
+    _m = CELL_RE.fullmatch(cell.strip())
+    if _m is None:
+        raise ValueError("[{}] is not a valid cell address".format(cell))
+
+    col = 0
+    for char in _m.group('col').upper():
+        col = col * 26 + ord(char) - ord('A') + 1
+
+    return int(_m.group('row')), col
+
+
+def xls_converter(xlrd, datemode):
+    """
+        Returns xls_value(cell type, value) -> value as read by
+        xlwings, for the cells of a workbook with datemode
+    """
+
+    empty = (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR)
+    date, boolean = xlrd.XL_CELL_DATE, xlrd.XL_CELL_BOOLEAN
+    as_datetime = xlrd.xldate_as_datetime
+
+    def xls_value(cell_type, value):
+        if cell_type in empty:
+            return None
+
+        if cell_type == date:
+            return as_datetime(value, datemode)
+
+        if cell_type == boolean:
+            return bool(value)
+
+        if value == '':
+            return None
+
+        return value
+
+    return xls_value
+
+
+def xlsx_defined_names(book):
+    """
+        Yields (name, DefinedName, scope) of an openpyxl workbook
+        (scope: sheet name, or -1 for workbook scope)
+
+        openpyxl >= 3.1 keeps sheet scoped names on each worksheet
+        and workbook names in a dict; 3.0 keeps every name in one
+        list, with the sheet index of sheet scoped names
+    """
+
+    if hasattr(book.defined_names, 'items'):
+        for ws in book.worksheets:
+            for name, defn in ws.defined_names.items():
+                yield name, defn, ws.title
+
+        for name, defn in book.defined_names.items():
+            yield name, defn, -1
+
+        return
+
+    for defn in book.defined_names.definedName:
+        if defn.localSheetId is None:
+            scope = -1
+        else:
+            scope = book.sheetnames[int(defn.localSheetId)]
+
+        yield defn.name, defn, scope
+
+
+def xlsx_value(value):
+    # numbers are returned as floats by xlwings
+    if type(value) is int:
+        return float(value)
+
+    if value == '':
+        return None
+
+    return value
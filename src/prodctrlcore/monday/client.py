@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 
 import logging
 
+from prodctrlcore import instrument
+
 ROOT_DIRECTORY = realpath(dirname(__file__))
 
 logger = logging.getLogger(__name__)
@@ -70,17 +72,27 @@ class MondayBoardClient(GraphQLClient):
     def _board_execute(self, query, variables=dict(), **kwargs):
         variables.update(kwargs)
 
+        operation = 'monday.query'
         if query in self.scripts.keys():
+            operation = 'monday.' + query
             query = self.scripts[query]
 
-        response = json.loads(
-            super().execute(query, variables))
+        with instrument.timer(operation) as timer:
+            result = super().execute(query, variables)
+            timer.add(bytes=len(result))
+
+        response = json.loads(result)
 
         if "data" in response.keys():
             if "complexity" in response['data'].keys():
-                self.complexity = response['data']['complexity']['after']
+                complexity = response['data']['complexity']
+                self.complexity = complexity['after']
                 logger.info("COMPLEXITY:{}".format(self.complexity))
 
+                # complexity.query is the cost of this query
+                if complexity.get('query') is not None:
+                    instrument.record(operation, complexity=complexity['query'])
+
             if 'boards' in response['data'].keys():
                 if len(response['data']['boards']) == 1:
                     return response['data']['boards'][0]
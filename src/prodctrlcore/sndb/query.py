@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 
-import pyodbc
 import re
 import sys
 
@@ -8,17 +7,29 @@ from datetime import datetime
 
 from prodctrlcore.io.db import get_sndb_conn
 
-import cli_stream
-import updatedPrograms
-
 
 def formatDateTime(x): return datetime.strftime(x, '%m/%d/%Y %H:%M')
 
 
 REPLACEMENTS = ['*', '#', '+']
 
-conn = get_sndb_conn()
-cur = conn.cursor()
+# connected on first query (see get_cursor)
+conn = None
+cur = None
+
+
+def get_cursor(cursor=None):
+    # cursor if given, otherwise the module's SNDB cursor
+    global conn, cur
+
+    if cursor is not None:
+        return cursor
+
+    if cur is None:
+        conn = get_sndb_conn()
+        cur = conn.cursor()
+
+    return cur
 
 
 def size(thkWidLen):
@@ -36,6 +47,8 @@ def recursive_replace(_str, find_vals, replace_val):
 
 
 def input_handler(val):
+    import cli_stream
+
     patterns = [
         (sheet, '^[A-Za-z]{1,2}[0-9]+$'),
         (part, '^[0-9]+[A-Za-z]?([-_][0-9A-Za-z#+]+)+$'),
@@ -55,7 +68,8 @@ def input_handler(val):
             cli_stream.inline_print('\n')
 
 
-def sheet(sheet):
+def sheet(sheet, cursor=None):
+    cur = get_cursor(cursor)
     cur.execute("""
         SELECT
             Program.ArcDateTime, Stock.SheetName, Program.ProgramName,
@@ -80,7 +94,8 @@ def sheet(sheet):
     return [list(x[:-3]) + [size(x[-3:])] for x in cur.fetchall()]
 
 
-def part(part):
+def part(part, cursor=None):
+    cur = get_cursor(cursor)
     cur.execute("""
         SELECT
             PIP.ArcDateTime, PIP.PartName, PIP.ProgramName,
@@ -104,11 +119,14 @@ def part(part):
     return list(cur.fetchall())
 
 
-def program(prog):
-    return [updatedPrograms.check_status(prog[:-1], cursor=cur)]
+def program(prog, cursor=None):
+    import updatedPrograms
+
+    return [updatedPrograms.check_status(prog[:-1], cursor=get_cursor(cursor))]
 
 
-def material_master(sapmm):
+def material_master(sapmm, cursor=None):
+    cur = get_cursor(cursor)
     cur.execute("""
         SELECT
             Program.ArcDateTime, Stock.PrimeCode, Stock.SheetName,
@@ -136,9 +154,13 @@ def material_master(sapmm):
 
 
 if __name__ == '__main__':
+    import cli_stream
+
     if len(sys.argv) > 1:
         for x in sys.argv[1:]:
             input_handler(x)
     else:
         cli_stream.IOLoop(input_handler, inputPrompt='Value: ')
-    conn.close()
+
+    if conn is not None:
+        conn.close()
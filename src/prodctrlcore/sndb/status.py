@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 
-import pyodbc
 import sys
 import datetime as dt
 
@@ -13,16 +12,27 @@ from prodctrlcore.io.db import get_sndb_conn
 def formatDateTime(x): return dt.datetime.strftime(x, '%m/%d/%Y %H:%M')
 
 
-conn = get_sndb_conn()
-cur = conn.cursor()
+# connected on first query (see get_cursor)
+conn = None
+cur = None
 
 lastProgram = None
 
 
+def get_cursor():
+    global conn, cur
+
+    if cur is None:
+        conn = get_sndb_conn()
+        cur = conn.cursor()
+
+    return cur
+
+
 # TODO: remove OYSUpdatedPrograms dependency
 
 def check_status(prog, cursor=None):
-    cur = cursor or conn.cursor()
+    cur = cursor or get_cursor()
     cur.execute("""
         SELECT
             Comp.CompletedDateTime, Comp.OperatorName,
@@ -89,6 +99,7 @@ def recent_updates(week=False, elseDays=1):
         days = elseDays
     start = dt.date.today() - dt.timedelta(days=days)
 
+    cur = get_cursor()
     cur.execute("""
         SELECT DISTINCT ProgramName
         FROM SNDbase91.dbo.ProgArchive
@@ -109,6 +120,7 @@ def main_updates(days=0):
         days = 1
     start = dt.date.today() - dt.timedelta(days=days)
 
+    cur = get_cursor()
     cur.execute("""
         SELECT DISTINCT ProgramName
         FROM SNDbase91.dbo.ProgArchive
@@ -123,6 +135,7 @@ def main_updates(days=0):
 def pl3_updates():
     start = dt.date(2019, 1, 1)
 
+    cur = get_cursor()
     cur.execute("""
         SELECT DISTINCT ProgramName
         FROM SNDbase91.dbo.ProgArchive
@@ -222,4 +235,6 @@ if __name__ == '__main__':
             if not in_str:
                 break
             input_handler(in_str)
-    conn.close()
+
+    if conn is not None:
+        conn.close()
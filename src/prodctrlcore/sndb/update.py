@@ -1,14 +1,24 @@
 #!/usr/bin/env python
 
 import argparse
-import pyodbc
 import re
 from datetime import datetime
 
 from prodctrlcore.io.db import get_sndb_conn
 
-sndb_conn = get_sndb_conn()
-sndb = sndb_conn.cursor()
+# connected on first query (see get_cursor)
+sndb_conn = None
+sndb = None
+
+
+def get_cursor():
+    global sndb_conn, sndb
+
+    if sndb is None:
+        sndb_conn = get_sndb_conn()
+        sndb = sndb_conn.cursor()
+
+    return sndb
 
 
 def main():
@@ -53,11 +63,13 @@ def main():
         if ret:
             print(ret + '\n')
 
-    sndb_conn.close()
+    if sndb_conn is not None:
+        sndb_conn.close()
 
 
 # arg :: UH >> update heat number, PO number and SAP MM if given
 def update_heat(prog, heat=None, po=None, mm=None):
+    sndb = get_cursor()
     sndb.execute("""
         SELECT HeatNumber, BinNumber, PrimeCode
         FROM StockArchive
@@ -87,6 +99,7 @@ def update_heat(prog, heat=None, po=None, mm=None):
 
 # arg :: US >> update sheet size
 def update_size(sheet, wid=None, len=None):
+    sndb = get_cursor()
     sndb.execute('SELECT Width, Length FROM Stock WHERE SheetName=?', sheet)
     db_wid, db_len = sndb.fetchone()
     wid = wid or input('Width: ').strip() or db_wid
@@ -104,6 +117,7 @@ def update_size(sheet, wid=None, len=None):
 
 
 def update_partname(oldPart, newPart=None):
+    sndb = get_cursor()
     newPart = newPart or input('New Part Name: ').strip()
 
     sndb.execute('''
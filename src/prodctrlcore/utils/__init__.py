@@ -1 +1,3 @@
 from .iter import CountingIter
+from .cache import FileCache
+from .fsindex import DirectoryIndex, MemoryScanner, dir_index
@@ -0,0 +1,151 @@
+
+import os
+import pickle
+
+from hashlib import sha1
+from os.path import join, expanduser, normcase, abspath
+
+CACHE_ENV = 'PRODCTRLCORE_CACHE'
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024    # 512 MB
+
+
+class FileCache:
+
+    """
+        FileCache: A local disk cache of data parsed from source files
+
+        Entries are keyed by source file path and are only returned
+        while the source file's fingerprint (mtime, size) matches
+        the fingerprint stored with the entry.
+
+        Location: directory/name
+            directory defaults to $PRODCTRLCORE_CACHE
+            or ~/.prodctrlcore/cache
+
+        Size: when the entries exceed max_size (bytes), the least
+            recently used entries are evicted
+
+        A disabled cache never returns or stores entries
+    """
+
+    def __init__(self, name, directory=None, max_size=DEFAULT_MAX_SIZE, enabled=True):
+        self.directory = join(directory or default_cache_dir(), name)
+        self.max_size = max_size
+        self.enabled = enabled
+
+    def get(self, path, default=None):
+        stored = self.get_entry(path)
+        if stored is None:
+            return default
+
+        _fingerprint, value = stored
+        try:
+            if _fingerprint != fingerprint(path):
+                return default
+        except OSError:
+            # source no longer exists
+            return default
+
+        return value
+
+    def get_entry(self, path):
+        """
+            Returns the stored (fingerprint, value) for path,
+            even if path has since changed (None if not stored)
+
+            for callers that update entries incrementally
+        """
+
+        if not self.enabled:
+            return None
+
+        entry = self._entry(path)
+        try:
+            with open(entry, 'rb') as entry_stream:
+                _path, _fingerprint, value = pickle.load(entry_stream)
+        except Exception:
+            # missing, corrupt or unreadable after a library upgrade
+            # (i.e. pickled DataFrames): a cache miss
+            return None
+
+        try:
+            # mark as recently used
+            os.utime(entry)
+        except OSError:
+            # read-only cache directory
+            pass
+
+        return _fingerprint, value
+
+    def set(self, path, value):
+        if not self.enabled:
+            return
+
+        # fingerprint before storing, so that a change
+        # while storing is not hidden by the entry
+        _fingerprint = fingerprint(path)
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        entry = self._entry(path)
+        temp = '{}.{}.tmp'.format(entry, os.getpid())
+        with open(temp, 'wb') as entry_stream:
+            pickle.dump((path, _fingerprint, value), entry_stream,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, entry)
+
+        self.evict()
+
+    def invalidate(self, path=None):
+        """
+            Removes the entry for path
+            or every entry if path is None
+        """
+
+        if path is not None:
+            entries = [self._entry(path)]
+        else:
+            entries = [entry.path for entry in self._scan()]
+
+        for entry in entries:
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        entries = sorted(self._scan(), key=lambda e: e.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+
+        # least recently used first
+        for entry in entries:
+            if total <= self.max_size:
+                break
+
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _scan(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [e for e in entries if e.name.endswith('.pickle')]
+        except FileNotFoundError:
+            return list()
+
+    def _entry(self, path):
+        key = sha1(normcase(abspath(path)).encode('utf-8')).hexdigest()
+
+        return join(self.directory, key + '.pickle')
+
+
+def fingerprint(path):
+    stat = os.stat(path)
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def default_cache_dir():
+    return os.getenv(CACHE_ENV) or join(expanduser('~'), '.prodctrlcore', 'cache')
@@ -0,0 +1,182 @@
+
+import os
+import threading
+
+from fnmatch import fnmatch
+from glob import glob, has_magic
+from os.path import basename, dirname, join, normcase
+from time import monotonic
+
+DEFAULT_TTL = 60    # seconds
+
+
+class DirectoryIndex:
+
+    """
+        DirectoryIndex: Cached directory listings
+
+        Listing a directory on a network share is a round trip,
+        so each directory is listed once and the listing is reused
+        for glob, exists, isfile and isdir until it is ttl seconds old.
+
+        Directories are listed by scanner (default: LocalScanner).
+        Use MemoryScanner as a local stand-in for the shares:
+            dir_index.scanner = MemoryScanner()
+
+        Listings do not see changes made after they are read;
+        call invalidate(directory) after creating files.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, scanner=None):
+        self.ttl = ttl
+        self.scanner = scanner or LocalScanner()
+
+        self._listings = dict()     # directory -> (time read, {name: (name, is_dir)})
+        self._lock = threading.Lock()
+
+    def listdir(self, directory):
+        """
+            Returns [(name, is_dir)] of the directory's entries
+
+            raises FileNotFoundError if the directory does not exist
+        """
+
+        return list(self._listing(directory).values())
+
+    def glob(self, pattern):
+        """
+            Full paths matching pattern
+
+            only the last component of pattern may contain wildcards
+            (other patterns are passed on to glob.glob)
+        """
+
+        directory, name = dirname(pattern), basename(pattern)
+        if has_magic(directory):
+            return glob(pattern)
+
+        if not has_magic(name):
+            return [pattern] if self.exists(pattern) else list()
+
+        try:
+            entries = self.listdir(directory)
+        except FileNotFoundError:
+            return list()
+
+        return [join(directory, _name) for _name, _ in entries if fnmatch(_name, name)]
+
+    def files(self, directory):
+        # full paths of files in directory
+        return [join(directory, name) for name, is_dir in self.listdir(directory) if not is_dir]
+
+    def exists(self, path):
+        return self._lookup(path) is not None
+
+    def isfile(self, path):
+        entry = self._lookup(path)
+
+        return entry is not None and not entry[1]
+
+    def isdir(self, path):
+        entry = self._lookup(path)
+
+        return entry is not None and entry[1]
+
+    def invalidate(self, directory=None):
+        """
+            Discards the listing of directory
+            or of every directory if directory is None
+        """
+
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(normcase(directory), None)
+
+    def _lookup(self, path):
+        path = path.rstrip('\\/')
+        directory, name = dirname(path), basename(path)
+
+        if not name or directory == path:
+            # drive or share root
+            return (path, True) if os.path.exists(path) else None
+
+        try:
+            return self._listing(directory).get(normcase(name))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def _listing(self, directory):
+        key = normcase(directory)
+
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing is not None and monotonic() - listing[0] < self.ttl:
+                return listing[1]
+
+        entries = dict()
+        for name, is_dir in self.scanner.scan(directory):
+            entries[normcase(name)] = (name, is_dir)
+
+        with self._lock:
+            self._listings[key] = (monotonic(), entries)
+
+        return entries
+
+
+class LocalScanner:
+
+    def scan(self, directory):
+        with os.scandir(directory) as entries:
+            return [(entry.name, entry.is_dir()) for entry in entries]
+
+
+class MemoryScanner:
+
+    """
+        MemoryScanner: An in-memory directory tree
+
+        stands in for the file system in DirectoryIndex, i.e.
+            scanner = MemoryScanner()
+            scanner.add_file(join(ENG_DIR, '1200123A-1', 'BOM', 'A.xls'))
+            dir_index.scanner = scanner
+            dir_index.invalidate()
+    """
+
+    def __init__(self, paths=list()):
+        self.dirs = dict()      # directory -> {name: is_dir}
+
+        for path in paths:
+            self.add_file(path)
+
+    def add_file(self, path):
+        self._add(path, False)
+
+    def add_dir(self, path):
+        self._add(path, True)
+
+    def remove(self, path):
+        self.dirs.get(normcase(dirname(path)), dict()).pop(basename(path), None)
+
+    def _add(self, path, is_dir):
+        directory, name = dirname(path), basename(path)
+        if is_dir:
+            self.dirs.setdefault(normcase(path), dict())
+
+        # parents
+        if directory and directory != path:
+            self._add(directory, True)
+
+        if name:
+            self.dirs.setdefault(normcase(directory), dict())[name] = is_dir
+
+    def scan(self, directory):
+        try:
+            return list(self.dirs[normcase(directory)].items())
+        except KeyError:
+            raise FileNotFoundError(directory)
+
+
+# shared index
+dir_index = DirectoryIndex()
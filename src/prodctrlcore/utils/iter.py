@@ -1,29 +1,120 @@
 
-from string import Template
+import sys
+import builtins
+
+from time import monotonic
 
 
 class CountingIter:
 
-    def __init__(self, iter, caption="", total=False):
-        self._iter = iter
-        self._index = 0
-        self.template = Template("\r[$index] {}".format(caption))
+    """
+        CountingIter: Progress of iterating over any iterable
+
+        for row in CountingIter(rows, "Reading rows", total=True):
+            ...
+
+        total:      True to use len(iterable) (if it has one)
+                    or the expected number of items
+                    (self.total: None if unknown)
+        interval:   seconds between redraws
+        every:      also redraw after this many items
+
+        progress shows count, total, throughput and ETA (if total
+        is known). It is redrawn in place when stream is a terminal,
+        otherwise it is written a line at a time.
+
+        sink:       callable sent a dict of the counters
+                    (caption, count, total, elapsed, rate, eta, done)
+                    instead of writing to stream
+    """
+
+    def __init__(self, iter, caption="", total=False, interval=0.5, every=None, sink=None, stream=None):
+        if total is True:
+            total = len(iter) if hasattr(iter, '__len__') else None
 
-        if total:
-            self.template = Template(
-                "\r[$index/{}] {}".format(len(iter), caption))
+        self._iter = builtins.iter(iter)
+        self.caption = caption
+        self.total = total or None
+
+        self.interval = interval
+        self.every = every
+        self.sink = sink
+        self.stream = stream or sys.stdout
+        self.is_tty = self.stream.isatty() if hasattr(self.stream, 'isatty') else False
+
+        self.count = 0
+        self.done = False
+        self.start = monotonic()
+        self._next_time = self.start + interval
+        self._next_count = every or float('inf')
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if self._index == len(self._iter):
-            print()
-            raise StopIteration
-
-        elem = self._iter[self._index]
-        self._index += 1
+        try:
+            elem = next(self._iter)
+        except StopIteration:
+            self.finish()
+            raise
 
-        print(self.template.substitute(index=self._index), end='')
+        self.count += 1
+        if self.count >= self._next_count or monotonic() >= self._next_time:
+            self.report()
 
         return elem
+
+    def finish(self):
+        if not self.done:
+            self.done = True
+            self.report()
+
+    def stats(self):
+        elapsed = monotonic() - self.start
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(self.total - self.count, 0) / rate
+
+        return dict(caption=self.caption, count=self.count, total=self.total,
+                    elapsed=elapsed, rate=rate, eta=eta, done=self.done)
+
+    def report(self):
+        self._next_time = monotonic() + self.interval
+        if self.every:
+            self._next_count = self.count + self.every
+
+        stats = self.stats()
+        if self.sink is not None:
+            self.sink(stats)
+            return
+
+        line = format_progress(stats)
+        if self.is_tty:
+            self.stream.write('\r' + line + ('\n' if self.done else ''))
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+
+def format_progress(stats):
+    if stats['total'] is not None:
+        count = "[{count}/{total}]".format(**stats)
+    else:
+        count = "[{count}]".format(**stats)
+
+    line = "{} {} ({:.1f}/s".format(count, stats['caption'], stats['rate'])
+    if stats['eta'] is not None and not stats['done']:
+        line += ", ETA {}".format(format_seconds(stats['eta']))
+    elif stats['done']:
+        line += ", {}".format(format_seconds(stats['elapsed']))
+
+    return line + ")"
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return "{}:{:0>2}:{:0>2}".format(hours, minutes, seconds)
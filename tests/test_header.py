@@ -0,0 +1,40 @@
+
+from prodctrlcore.io import HeaderParser
+from prodctrlcore.hssformats._alias import workorder as WORKORDER_ALIASES
+
+WORKORDER_HEADER = [
+    'TransType', 'District', 'ItemName', 'Qty', 'Material', 'DueDate',
+    'Customer', 'DwgNumber', 'Remark', 'ItemData1', 'ItemData2', 'ItemData3',
+    'ItemData4', 'Process', 'SAP Network Number', 'Operation2', 'Operation3',
+    'Operation4', 'Operation5', 'Operation6', 'Operation7', 'Operation8',
+    'Operation9', 'Operation10',
+]
+
+
+def workorder_header():
+    header = HeaderParser(header=list(WORKORDER_HEADER))
+    header.add_header_aliases(WORKORDER_ALIASES.copy())
+
+    return header
+
+
+def test_infer_aliased_workorder_header():
+    header = workorder_header()
+
+    assert header.get_index('matl') == WORKORDER_HEADER.index('Material')
+    assert header.get_index('op2') == WORKORDER_HEADER.index('Operation2')
+    assert header.get_index('remark') == WORKORDER_HEADER.index('Remark')
+    assert header.get_index('MaterialMaster') == WORKORDER_HEADER.index('Operation6')
+
+
+def test_parsed_row_aliased_workorder_header():
+    header = workorder_header()
+    row = header.parse_row(list(WORKORDER_HEADER))
+
+    assert row.matl == 'Material'
+    assert row.op2 == 'Operation2'
+    assert row.remark == 'Remark'
+
+    row.matl = 'A709-50W'
+    assert row[WORKORDER_HEADER.index('Material')] == 'A709-50W'
+    assert 'matl' not in row.__dict__
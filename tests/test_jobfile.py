@@ -0,0 +1,32 @@
+
+from prodctrlcore.io import FileSheet, FileSheetReader
+
+
+def tag_schedule_sheet():
+    # tag schedule layout: header in C1:N1, plus N2 and O2
+    # (N1 and N2 label the same column)
+    row1 = [None, None] + ['H{}'.format(c) for c in 'CDEFGHIJKLMN']
+    row2 = [None] * 13 + ['N2 Header', 'O2 Header']
+    data = [None, None] + ['{}4'.format(c) for c in 'CDEFGHIJKLMNOP']
+
+    return FileSheet('WEBS', [row1, row2, [None], data])
+
+
+def test_split_header_columns():
+    reader = FileSheetReader(tag_schedule_sheet(), header_range=['C1:N1', 'O2:N2'], first_data_row=4)
+    row = next(reader.iter_rows())
+
+    assert reader.first_col == 3
+    assert row.get_item('HC') == 'C4'
+    assert row.get_item('HN') == 'N4'
+    assert row.get_item('N2 Header') == 'N4'
+    assert row.get_item('O2 Header') == 'O4'
+
+
+def test_split_header_to_frame():
+    reader = FileSheetReader(tag_schedule_sheet(), header_range=['C1:N1', 'O2:N2'], first_data_row=4)
+    frame = reader.to_frame()
+
+    assert frame.at[0, 'HN'] == 'N4'
+    assert frame.at[0, 'O2 Header'] == 'O4'
+    assert 'N2 Header' not in frame.columns
@@ -0,0 +1,41 @@
+
+from prodctrlcore.io import FileSheet, FileSheetReader
+from prodctrlcore.hssformats.tagschedule import TagScheduleSheets
+
+
+def webflg_sheet(name, prefix):
+    # header in C1:N1, plus N2 and O2; data from row 4
+    row1 = [None, None] + ['H{}'.format(c) for c in 'CDEFGHIJKLMN']
+    row2 = [None] * 13 + ['Matl', 'Qty']
+    data = [None, None] + ['{}{}'.format(prefix, c) for c in 'CDEFGHIJKLMNO']
+
+    return FileSheet(name, [row1, row2, [None], data])
+
+
+class SheetsBook(TagScheduleSheets):
+
+    def __init__(self, sheets):
+        self.job = '1200123A'
+        self.shipment = 1
+        self.sheets = {sheet.name: sheet for sheet in sheets}
+        self._tag_sheets = dict()
+
+    def sheet(self, sheet_name, **kwargs):
+        return FileSheetReader(self.sheets[sheet_name], **kwargs)
+
+
+def test_to_frame_labels():
+    book = SheetsBook([webflg_sheet('WEBS', 'W'), webflg_sheet('FLANGES', 'F')])
+    frame = book.to_frame()
+
+    assert list(frame['part_type']) == ['WEB', 'FLANGE']
+    assert list(frame['job']) == ['1200123A', '1200123A']
+    assert list(frame['HN']) == ['WN', 'FN']
+    assert list(frame['Qty']) == ['WO', 'FO']
+
+
+def test_sheets_bound_once():
+    book = SheetsBook([webflg_sheet('WEBS', 'W'), webflg_sheet('FLANGES', 'F')])
+
+    assert book.webs is book.webs
+    assert list(book._tag_sheets) == ['WEBS']
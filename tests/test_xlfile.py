@@ -0,0 +1,118 @@
+
+import openpyxl
+
+from openpyxl.workbook.defined_name import DefinedName
+
+from prodctrlcore.io import FileBook, FileSheet
+from prodctrlcore.io.xlfile import parse_address, parse_cell
+
+
+def grid_sheet():
+    # A1:C3 filled, row 4 and column D empty
+    cells = [
+        ['a1', 'b1', 'c1'],
+        ['a2', 'b2', 'c2'],
+        ['a3', 'b3', 'c3'],
+    ]
+
+    return FileSheet('Grid', cells)
+
+
+def test_parse_cell():
+    assert parse_cell('A1') == (1, 1)
+    assert parse_cell('$AB$12') == (12, 28)
+    assert parse_cell('xfd1048576') == (1048576, 16384)
+
+
+def test_parse_address():
+    assert parse_address('B2') == ((2, 2), (2, 2))
+    assert parse_address('B2:AB2') == ((2, 2), (2, 28))
+
+
+def test_parse_address_reversed():
+    assert parse_address('O2:N2') == ((2, 14), (2, 15))
+    assert parse_address('C3:A1') == ((1, 1), (3, 3))
+
+
+def test_parse_cell_invalid():
+    try:
+        parse_cell('A')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError not raised")
+
+
+def test_value_shapes():
+    # same shapes as xlwings
+    sheet = grid_sheet()
+
+    assert sheet.range('A1').value == 'a1'
+    assert sheet.range('A1:C1').value == ['a1', 'b1', 'c1']
+    assert sheet.range('B1:B3').value == ['b1', 'b2', 'b3']
+    assert sheet.range('A1:B2').value == [['a1', 'b1'], ['a2', 'b2']]
+
+
+def test_value_ndim():
+    sheet = grid_sheet()
+
+    assert sheet.range('A1').options(ndim=1).value == ['a1']
+    assert sheet.range('A1').options(ndim=2).value == [['a1']]
+    assert sheet.range('A1:C1').options(ndim=2).value == [['a1', 'b1', 'c1']]
+    assert sheet.range('A1:A2').options(ndim=2).value == [['a1'], ['a2']]
+
+
+def test_value_outside_cells():
+    sheet = grid_sheet()
+
+    assert sheet.range('D1').value is None
+    assert sheet.range('C3:D4').value == [['c3', None], [None, None]]
+
+
+def test_expand():
+    sheet = grid_sheet()
+
+    assert sheet.range('A1').expand('right').shape == (1, 3)
+    assert sheet.range('A1').expand('down').shape == (3, 1)
+    assert sheet.range('A1').expand().shape == (3, 3)
+    assert sheet.range('B2').expand().last_cell.value == 'c3'
+
+
+def test_set_value():
+    sheet = grid_sheet()
+
+    sheet.range('D5').value = [[1, 2], [3, 4]]
+    assert sheet.range('D5:E6').value == [[1, 2], [3, 4]]
+    assert sheet.range('A4').value is None
+
+
+def test_resolve_name(tmp_path):
+    path = str(tmp_path / 'names.xlsx')
+
+    wb = openpyxl.Workbook()
+    first = wb.active
+    first.title = 'First'
+    second = wb.create_sheet('Second')
+    for ws in (first, second):
+        for row in range(1, 4):
+            ws.append(['{}{}'.format(ws.title, row)])
+
+    workbook_name = DefinedName('Area', attr_text="First!$A$1:$A$2")
+    if hasattr(wb.defined_names, 'items'):
+        # openpyxl >= 3.1
+        wb.defined_names['Area'] = workbook_name
+        second.defined_names['Area'] = DefinedName('Area', attr_text="Second!$A$2:$A$3")
+    else:
+        wb.defined_names.append(workbook_name)
+        wb.defined_names.append(DefinedName('Area', attr_text="Second!$A$2:$A$3", localSheetId=1))
+    first.print_area = 'A1:A3'
+    wb.save(path)
+
+    book = FileBook(path)
+
+    # workbook scope, unless the sheet has a name of its own
+    assert book.sheets['First'].range('Area').value == ['First1', 'First2']
+    assert book.sheets['Second'].range('Area').value == ['Second2', 'Second3']
+
+    assert book.resolve_name('Print_Area', book.sheets['First']) == ('First', '$A$1:$A$3')
+    assert book.sheets['First'].range('Print_Area').shape == (3, 1)